@@ -1,117 +1,328 @@
-import yaml
-import sys
+import argparse
+import hashlib
+import marshal
+import os
+import shutil
+import struct
+from array import array
+from collections import namedtuple
+from itertools import repeat
+from log_formats import LOG_FORMATS, LogFile
+
+# Спецификация команды: код операции A, допустимые границы B и C,
+# маски и ширина полей при упаковке, текст ошибки для значений вне диапазона
+OpcodeSpec = namedtuple('OpcodeSpec', ['code', 'b_limit', 'c_limit', 'b_mask', 'b_bits', 'c_mask', 'error'])
+
+OPCODES = {
+    # B — 13 бит, C — 12 бит
+    "LOAD_CONST": OpcodeSpec(36, 2**16, 1024, 0x1FFF, 13, 0xFFF, "Values out of range"),
+    # B и C — по 12 бит
+    "READ_MEM": OpcodeSpec(55, 2**16, 2**16, 0xFFF, 12, 0xFFF, "Addresses out of range"),
+    "WRITE_MEM": OpcodeSpec(84, 2**16, 2**16, 0xFFF, 12, 0xFFF, "Addresses out of range"),
+    "BITREVERSE": OpcodeSpec(186, 2**16, 2**16, 0xFFF, 12, 0xFFF, "Addresses out of range"),
+}
+
+# Обратная таблица: код операции -> (мнемоника, спецификация)
+OPCODES_BY_CODE = {spec.code: (name, spec) for name, spec in OPCODES.items()}
+
+INSTRUCTION_SIZE = 5  # Все команды занимают 5 байтов
+STREAM_BLOCK = 4096  # Количество команд в буфере при потоковой записи
+
+# Поле A — 1 байт, поля B и C упакованы в следующие 4 байта
+_INSTRUCTION = struct.Struct('<BI')
+
+# Версия формата команд; входит в ключ кэша и должна меняться при изменении кодирования
+ISA_VERSION = '1'
+
+HASH_BLOCK = 1 << 20  # Размер блока при хэшировании исходного файла
+
+
+def common_prefix(a, b):
+    """Длина общего начала двух строк (двоичный поиск по срезам: сравнение идёт в C)."""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix(a, b, limit):
+    """Длина общего конца двух строк, не больше limit."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class AssemblyCache:
+    """Кэш результатов ассемблирования на диске.
+
+    Готовые .bin и лог хранятся под хэшем исходного текста, версии ISA и формата
+    лога. Для каждого исходного файла дополнительно сохраняется последний текст
+    вместе с результатом, чтобы после правки заново разбирать и кодировать
+    только изменённые строки.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, input_file, log_format):
+        h = hashlib.sha256(f"{ISA_VERSION}:{log_format}:".encode())
+        with open(input_file, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    def path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def restore(self, key, output_file, log_file):
+        """Скопировать закэшированные результаты; вернуть False, если их нет."""
+        bin_path, log_path = self.path(key + '.bin'), self.path(key + '.log')
+        if not os.path.exists(bin_path) or (log_file is not None and not os.path.exists(log_path)):
+            return False
+        shutil.copyfile(bin_path, output_file)
+        if log_file is not None:
+            shutil.copyfile(log_path, log_file)
+        return True
+
+    def store(self, key, output_file, log_file):
+        self.copy_in(output_file, key + '.bin')
+        if log_file is not None:
+            self.copy_in(log_file, key + '.log')
+
+    def copy_in(self, source, name):
+        """Скопировать файл в кэш через временный файл: параллельные задания не увидят неполную запись."""
+        tmp_path = f"{self.path(name)}.{os.getpid()}.tmp"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, self.path(name))
+
+    def lines_path(self, input_file):
+        name = hashlib.sha256(os.path.abspath(input_file).encode()).hexdigest()
+        return self.path(name + '.lines')
+
+    def load_lines(self, input_file):
+        """Прошлое ассемблирование файла: (текст, флаги команд по строкам, коды операций,
+        операнды B, операнды C, байты программы) или None."""
+        try:
+            with open(self.lines_path(input_file), 'rb') as f:
+                isa_version, lines = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return lines if isa_version == ISA_VERSION else None
+
+    def store_lines(self, input_file, lines):
+        path = self.lines_path(input_file)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump((ISA_VERSION, lines), f)
+        os.replace(tmp_path, path)
+
 
 class Assembler:
-    def __init__(self):
+    def __init__(self, verbose=False):
         self.instructions = []
+        self.verbose = verbose  # Печатать каждую закодированную команду
 
     def parse_instruction(self, line):
+        instr = self.parse_line(line)
+        if instr is not None:
+            self.instructions.append(instr)
+
+    def parse_line(self, line):
+        """Разобрать строку программы в кортеж (A, B, C, размер) или None."""
         parts = line.split()
-        command = parts[0]
-
-        if command == "LOAD_CONST":
-            a, b, c = 36, int(parts[1]), int(parts[2])
-            if not (0 <= b < 2**16 and 0 <= c < 1024):  # B - 2 байта, C - 2 байта
-                raise ValueError(f"Values out of range: B={b}, C={c} for LOAD_CONST")
-            self.instructions.append((a, b, c, 5))  # 5 байтов для LOAD_CONST
-
-        elif command == "READ_MEM":
-            a, b, c = 55, int(parts[1]), int(parts[2])
-            if not (0 <= b < 2**16 and 0 <= c < 2**16):  # B и C занимают по 2 байта
-                raise ValueError(f"Addresses out of range: B={b}, C={c} for READ_MEM")
-            self.instructions.append((a, b, c, 5))  # 5 байтов для READ_MEM
-
-        elif command == "WRITE_MEM":
-            a, b, c = 84, int(parts[1]), int(parts[2])
-            if not (0 <= b < 2**16 and 0 <= c < 2**16):  # B и C занимают по 2 байта
-                raise ValueError(f"Addresses out of range: B={b}, C={c} for WRITE_MEM")
-            self.instructions.append((a, b, c, 5))  # 5 байтов для WRITE_MEM
-
-        elif command == "BITREVERSE":
-            a, b, c = 186, int(parts[1]), int(parts[2])
-            if not (0 <= b < 2**16 and 0 <= c < 2**16):  # B и C занимают по 2 байта
-                raise ValueError(f"Addresses out of range: B={b}, C={c} for BITREVERSE")
-            self.instructions.append((a, b, c, 5))  # 5 байтов для BITREVERSE
-
-    def assemble(self, input_file, output_file, log_file):
-        with open(input_file, 'r') as f:
-            lines = f.readlines()
+        spec = OPCODES.get(parts[0])
+        if spec is None:
+            return None
 
-        binary_data = bytearray()
-        log_entries = []
+        b, c = int(parts[1]), int(parts[2])
+        if not (0 <= b < spec.b_limit and 0 <= c < spec.c_limit):
+            raise ValueError(f"{spec.error}: B={b}, C={c} for {parts[0]}")
+        return (spec.code, b, c, INSTRUCTION_SIZE)
 
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            self.parse_instruction(line)
-
-        for instr in self.instructions:
-            a, b, c, size = instr
-
-	    # Упаковка инструкций в 5 байтов
-            if size == 5:
-		# Поле A — 8 бит (1 байт)
-                a_byte = a.to_bytes(1, byteorder='little')
-                
-                if a == 36:
-
-		   # Поле B — 13 бит
-                   b_value = b & 0x1FFF  # Ограничиваем до 13 бит
-                   c_value = c & 0xFFF  # Упаковываем ровно 13 бит
-                
-                   combined = (b_value) | (c_value << 13)
-
-                   combined_bytes = combined.to_bytes(4, byteorder='little')
-
-                   instruction_bytes = a_byte + combined_bytes[:4]
-                   
-                else:
-                   b_value = b & 0xFFF  # Ограничиваем B до 12 бит
-                   c_value = c & 0xFFF  # Ограничиваем C до 12 бит
-                   
-                   combined = (b_value) | (c_value << 12)
-                   
-                   combined_bytes = combined.to_bytes(4, byteorder='little')
-                   
-                   instruction_bytes = a_byte + combined_bytes[:4]
-
-		# Логирование с измененной логикой вывода
-                log_entry = f"Тест (A={a}, B={b}, C={c}):\n" + \
-                    f"{', '.join(f'0x{byte:02X}' for byte in instruction_bytes)}"
-                print(log_entry)
-                log_entries.append({
-		    'instruction': "LOAD_CONST" if a == 36 else
-		    "READ_MEM" if a == 55 else
-		    "WRITE_MEM" if a == 84 else
-		    "BITREVERSE",
-		    'A': a,
-		    'B': b,
-		    'C': c,
-		    'bytes': [f"0x{byte:02X}" for byte in instruction_bytes]
-		})
-
-		# Добавление полученной последовательности байтов в итоговый бинарный файл
-                binary_data.extend(instruction_bytes)
+    def pack_instruction(self, buffer, offset, a, b, c):
+        """Упаковать команду в buffer по смещению offset."""
+        spec = OPCODES_BY_CODE[a][1]
+        _INSTRUCTION.pack_into(buffer, offset, a, (b & spec.b_mask) | ((c & spec.c_mask) << spec.b_bits))
+
+    def encode_instruction(self, a, b, c, size):
+        """Упаковать команду в байты."""
+        if size != INSTRUCTION_SIZE:
+            return b''
+        buffer = bytearray(INSTRUCTION_SIZE)
+        self.pack_instruction(buffer, 0, a, b, c)
+        return bytes(buffer)
+
+    def print_instruction(self, a, b, c, instruction_bytes):
+        """Вывести байты закодированной команды."""
+        print(f"Тест (A={a}, B={b}, C={c}):\n" +
+              f"{', '.join(f'0x{byte:02X}' for byte in instruction_bytes)}")
 
+    def log_instruction(self, log, a, b, c, instruction_bytes):
+        """Записать команду в лог и, в подробном режиме, вывести её."""
+        if self.verbose:
+            self.print_instruction(a, b, c, instruction_bytes)
+        if log is not None:
+            log.write(OPCODES_BY_CODE[a][0], a, b, c, instruction_bytes)
+
+    def assemble(self, input_file, output_file, log_file=None, stream=False, log_format='yaml', cache=None):
+        if cache is not None:
+            key = cache.key(input_file, log_format)
+            if cache.restore(key, output_file, log_file):
+                return
+            if stream:
+                self.assemble_stream(input_file, output_file, log_file, log_format)
+            else:
+                self.assemble_lines(input_file, output_file, log_file, log_format, cache)
+            cache.store(key, output_file, log_file)
+            return
+
+        if stream:
+            return self.assemble_stream(input_file, output_file, log_file, log_format)
+        self.assemble_lines(input_file, output_file, log_file, log_format)
+
+    def assemble_lines(self, input_file, output_file, log_file=None, log_format='yaml', cache=None):
+        """Ассемблирование всей программы в памяти; с кэшем кодируются только новые строки."""
+        if cache is not None:
+            binary_data = self.encode_cached(input_file, cache)
+        else:
+            self.instructions = []
+            with open(input_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self.parse_instruction(line)
+
+            # Все команды упаковываются в заранее выделенный буфер
+            binary_data = bytearray(INSTRUCTION_SIZE * len(self.instructions))
+            for i, (a, b, c, size) in enumerate(self.instructions):
+                self.pack_instruction(binary_data, i * INSTRUCTION_SIZE, a, b, c)
 
         # Запись в бинарный файл
         with open(output_file, 'wb') as f:
             f.write(binary_data)
 
-        # Запись лога в YAML файл
-        with open(log_file, 'w') as f:
-            yaml.dump(log_entries, f)
+        # Запись лога в выбранном формате
+        if log_file is not None or self.verbose:
+            view = memoryview(binary_data)
+            log = LogFile(log_file, log_format) if log_file is not None else None
+            try:
+                for i, (a, b, c, size) in enumerate(self.instructions):
+                    self.log_instruction(log, a, b, c, view[i * INSTRUCTION_SIZE:(i + 1) * INSTRUCTION_SIZE])
+            finally:
+                if log is not None:
+                    log.close()
+
+    def encode_cached(self, input_file, cache):
+        """Собрать байты программы, заново кодируя только изменённые строки.
+
+        Общие с прошлой версией файла начало и конец берутся из сохранённого
+        результата; разбираются и кодируются только строки между ними.
+        """
+        with open(input_file, 'r') as f:
+            text = f.read()
+        previous = cache.load_lines(input_file)
+        old_text, old_flags, old_opcodes, old_b, old_c, old_binary = previous or ('', b'', b'', b'', b'', b'')
+        old_opcodes, old_b, old_c = array('B', old_opcodes), array('H', old_b), array('H', old_c)
+
+        # Строки, целиком лежащие в общем префиксе и общем суффиксе текста, не изменились
+        prefix = common_prefix(old_text, text)
+        suffix = common_suffix(old_text, text, min(len(old_text), len(text)) - prefix)
+        head = old_text.count('\n', 0, prefix)
+        tail = text.count('\n', len(text) - suffix)
+        new_lines = text.split('\n')
+        old_lines = old_text.split('\n') if previous else []
+        # Граница по символам может пройти посередине строки: дотягиваем её до целых строк
+        limit = min(len(old_lines), len(new_lines))
+        while head < limit - tail and old_lines[head] == new_lines[head]:
+            head += 1
+        while tail < limit - head and old_lines[-1 - tail] == new_lines[-1 - tail]:
+            tail += 1
+        old_line_count = len(old_lines)
+
+        # Номера первой команды общего начала и общего конца в прошлом результате
+        head_count = old_flags.count(1, 0, head)
+        tail_start = len(old_opcodes) - old_flags.count(1, old_line_count - tail)
+
+        flags = bytearray(old_flags[:head])
+        opcodes, operands_b, operands_c = old_opcodes[:head_count], old_b[:head_count], old_c[:head_count]
+        binary_data = bytearray(old_binary[:head_count * INSTRUCTION_SIZE])
+        for line in new_lines[head:len(new_lines) - tail]:
+            line = line.strip()
+            instr = self.parse_line(line) if line else None
+            flags.append(instr is not None)
+            if instr is not None:
+                a, b, c, size = instr
+                opcodes.append(a)
+                operands_b.append(b)
+                operands_c.append(c)
+                binary_data += self.encode_instruction(a, b, c, size)
+        flags += old_flags[old_line_count - tail:]
+        opcodes += old_opcodes[tail_start:]
+        operands_b += old_b[tail_start:]
+        operands_c += old_c[tail_start:]
+        binary_data += old_binary[tail_start * INSTRUCTION_SIZE:]
+
+        if text != old_text or not previous:
+            cache.store_lines(input_file, (text, bytes(flags), opcodes.tobytes(), operands_b.tobytes(),
+                                           operands_c.tobytes(), bytes(binary_data)))
+        self.instructions = list(zip(opcodes, operands_b, operands_c, repeat(INSTRUCTION_SIZE)))
+        return binary_data
+
+    def assemble_stream(self, input_file, output_file, log_file=None, log_format='yaml'):
+        """Потоковое ассемблирование: строки читаются и кодируются по одной,
+        байты и записи лога сразу пишутся в файлы, self.instructions не растёт."""
+        buffer = bytearray(INSTRUCTION_SIZE * STREAM_BLOCK)
+        view = memoryview(buffer)
+        offset = 0
+
+        with open(input_file, 'r') as src, open(output_file, 'wb') as out:
+            log = LogFile(log_file, log_format) if log_file is not None else None
+            try:
+                for line in src:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    instr = self.parse_line(line)
+                    if instr is None:
+                        continue
+
+                    a, b, c, size = instr
+                    self.pack_instruction(buffer, offset, a, b, c)
+                    self.log_instruction(log, a, b, c, view[offset:offset + INSTRUCTION_SIZE])
+
+                    offset += INSTRUCTION_SIZE
+                    if offset == len(buffer):
+                        out.write(buffer)
+                        offset = 0
+                out.write(view[:offset])
+            finally:
+                if log is not None:
+                    log.close()
 
 
 # Запуск с аргументами командной строки
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: python3 assembler.py <input_file> <output_file> <log_file>")
-    else:
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
-        log_file = sys.argv[3]
-
-        assembler = Assembler()
-        assembler.assemble(input_file, output_file, log_file)
+    parser = argparse.ArgumentParser(description="УВМ assembler")
+    parser.add_argument("input_file", help="Path to the program text (e.g., program.asm)")
+    parser.add_argument("output_file", help="Path to the output binary file (e.g., program.bin)")
+    parser.add_argument("log_file", nargs='?', help="Path to the log file (e.g., program.log)")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, default='yaml', help="Log file format (default: yaml)")
+    parser.add_argument("--stream", action="store_true", help="Assemble line by line with bounded memory")
+    parser.add_argument("--verbose", action="store_true", help="Print every encoded command")
+    parser.add_argument("--cache-dir", help="Reuse assembled output cached in this directory")
+    args = parser.parse_args()
+
+    assembler = Assembler(verbose=args.verbose)
+    cache = AssemblyCache(args.cache_dir) if args.cache_dir else None
+    assembler.assemble(args.input_file, args.output_file, args.log_file, stream=args.stream,
+                       log_format=args.log_format, cache=cache)
@@ -0,0 +1,63 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SUMMARY_NAME = 'summary.json'
+
+
+def unique_names(names):
+    """Сделать имена файлов результатов уникальными: повторы получают суффикс -2, -3, ...
+
+    Суффикс подбирается так, чтобы не совпасть ни с одним из исходных имён.
+    """
+    names = list(names)
+    taken = set(names)
+    used = set()
+    result = []
+    for name in names:
+        unique, number = name, 1
+        while unique in used or unique != name and unique in taken:
+            number += 1
+            unique = f"{name}-{number}"
+        used.add(unique)
+        result.append(unique)
+    return result
+
+
+def run_pool(function, items, initializer, settings, workers=None, finalizer=None, key='jobs'):
+    """Выполнить function для каждого элемента items в пуле процессов и вернуть сводку.
+
+    initializer(settings) вызывается один раз на рабочий процесс, function возвращает
+    отчёт со статусом 'ok' или 'error'. Отчёты попадают в сводку под ключом key.
+    """
+    start = time.perf_counter()
+    if workers == 1:
+        # Без пула процессов: удобно для отладки и небольших наборов
+        initializer(settings)
+        try:
+            reports = [function(item) for item in items]
+        finally:
+            if finalizer is not None:
+                finalizer()
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(items) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=(settings,)) as executor:
+            reports = list(executor.map(function, items, chunksize=chunksize))
+
+    return {
+        'total': len(reports),
+        'succeeded': sum(report['status'] == 'ok' for report in reports),
+        'failed': sum(report['status'] != 'ok' for report in reports),
+        'workers': workers,
+        'seconds': time.perf_counter() - start,
+        key: reports,
+    }
+
+
+def write_summary(output_dir, summary):
+    """Сохранить сводку в output_dir/summary.json."""
+    with open(os.path.join(output_dir, SUMMARY_NAME), 'w') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
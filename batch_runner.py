@@ -0,0 +1,118 @@
+import argparse
+import os
+import time
+from assembler import Assembler
+from batch_pool import run_pool, unique_names, write_summary
+from interpreter import Interpreter
+from log_formats import LOG_FORMATS
+
+MODES = ('assemble', 'execute', 'both')
+
+# Расширения файлов результата для каждого формата
+RESULT_EXTENSIONS = {'yaml': '.yaml', 'jsonl': '.jsonl', 'binary': '.res'}
+
+# Экземпляры, переиспользуемые всеми заданиями одного рабочего процесса
+_assembler = None
+_interpreter = None
+_settings = None
+
+
+def collect_inputs(source):
+    """Список входных .asm/.bin файлов из каталога или файла-манифеста (по пути на строку)."""
+    if os.path.isdir(source):
+        names = sorted(os.listdir(source))
+        return [os.path.join(source, name) for name in names if name.endswith(('.asm', '.bin'))]
+
+    base = os.path.dirname(source)
+    with open(source) as f:
+        paths = [line.strip() for line in f]
+    return [os.path.join(base, path) for path in paths if path and not path.startswith('#')]
+
+
+def init_worker(settings):
+    """Создать ассемблер и интерпретатор один раз на рабочий процесс."""
+    global _assembler, _interpreter, _settings
+    _settings = settings
+    _assembler = Assembler()
+    _interpreter = Interpreter(memory_size=settings['memory_size'], batch=settings['batch'], jit=settings['jit'])
+
+
+def run_job(job):
+    """Ассемблировать и/или выполнить одну программу; ошибки попадают в отчёт.
+
+    job — (имя файлов результата, путь к программе).
+    """
+    stem, path = job
+    settings = _settings
+    output_dir = settings['output_dir']
+    report = {'input': path, 'status': 'ok'}
+
+    try:
+        bin_path = path
+        if path.endswith('.asm') and settings['mode'] in ('assemble', 'both'):
+            bin_path = os.path.join(output_dir, stem + '.bin')
+            log_path = os.path.join(output_dir, stem + '.log')
+            start = time.perf_counter()
+            _assembler.assemble(path, bin_path, log_path, log_format=settings['log_format'])
+            report['assemble_seconds'] = time.perf_counter() - start
+            report['binary'] = bin_path
+
+        if bin_path.endswith('.bin') and settings['mode'] in ('execute', 'both'):
+            if not os.path.exists(bin_path):
+                raise FileNotFoundError(f"Input file '{bin_path}' not found")
+            result_path = os.path.join(output_dir, stem + RESULT_EXTENSIONS[settings['result_format']])
+            start = time.perf_counter()
+            _interpreter.reset()
+            _interpreter.run_file(bin_path, result_path, settings['memory_range'],
+                                  result_format=settings['result_format'])
+            report['execute_seconds'] = time.perf_counter() - start
+            report['result'] = result_path
+    except Exception as e:
+        report['status'] = 'error'
+        report['error'] = f"{type(e).__name__}: {e}"
+
+    return report
+
+
+def run_batch(inputs, output_dir, mode='both', memory_range=(0, 1024), memory_size=1024,
+              workers=None, log_format='yaml', result_format='yaml', batch=False, jit=False):
+    """Обработать набор программ в пуле процессов и вернуть сводку."""
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {
+        'output_dir': output_dir,
+        'mode': mode,
+        'memory_range': tuple(memory_range),
+        'memory_size': memory_size,
+        'log_format': log_format,
+        'result_format': result_format,
+        'batch': batch,
+        'jit': jit,
+    }
+
+    # Одноимённые программы (x.asm и x.bin, a/x.asm и b/x.asm) не должны перезаписывать результаты друг друга
+    names = unique_names(os.path.splitext(os.path.basename(path))[0] for path in inputs)
+    jobs = list(zip(names, inputs))
+    return write_summary(output_dir, run_pool(run_job, jobs, init_worker, settings, workers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch assembler/interpreter runner")
+    parser.add_argument("source", help="Directory with .asm/.bin files or a manifest with one path per line")
+    parser.add_argument("output_dir", help="Directory for binaries, logs, results and summary.json")
+    parser.add_argument("--mode", choices=MODES, default='both', help="What to do with the inputs (default: both)")
+    parser.add_argument("--memory-range", type=int, nargs=2, default=(0, 1024), metavar=('START', 'END'),
+                        help="Memory range to save for every program (default: 0 1024)")
+    parser.add_argument("--memory-size", type=int, default=1024, help="Number of memory cells (default: 1024)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, default='yaml', help="Assembler log format")
+    parser.add_argument("--result-format", choices=LOG_FORMATS, default='yaml', help="Interpreter result format")
+    parser.add_argument("--batch", action="store_true", help="Batch independent commands in the interpreter")
+    parser.add_argument("--jit", action="store_true", help="Compile programs into Python functions")
+    args = parser.parse_args()
+
+    summary = run_batch(collect_inputs(args.source), args.output_dir, mode=args.mode,
+                        memory_range=args.memory_range, memory_size=args.memory_size, workers=args.workers,
+                        log_format=args.log_format, result_format=args.result_format,
+                        batch=args.batch, jit=args.jit)
+    print(f"Processed {summary['total']} programs in {summary['seconds']:.2f}s: "
+          f"{summary['succeeded']} succeeded, {summary['failed']} failed")
@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import time
+from batch_pool import run_pool, unique_names, write_summary
+from config_translator import ConfigTranslator, ConstantTable
+
+# Общая прелюдия констант и настройки, создаваемые один раз на рабочий процесс
+_prelude = None
+_settings = None
+
+
+def collect_inputs(source):
+    """Задания (имя результата, путь, номер строки, смещение строки) из каталога .json,
+    файла JSON Lines или манифеста.
+
+    Для файлов .json номер строки и смещение равны None: документ — весь файл.
+    Документ JSON Lines рабочий процесс читает сам по смещению.
+    """
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.endswith('.json'))
+        return [(os.path.splitext(name)[0], os.path.join(source, name), None, None) for name in names]
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    if source.endswith('.jsonl'):
+        jobs = []
+        offset = 0
+        with open(source, 'rb') as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    jobs.append((f"{stem}.{number}", source, number, offset))
+                offset += len(line)
+        return jobs
+
+    base = os.path.dirname(source)
+    with open(source) as f:
+        paths = [line.strip() for line in f]
+    paths = [os.path.join(base, path) for path in paths if path and not path.startswith('#')]
+    # a/x.json и b/x.json из одного манифеста не должны перезаписывать результаты друг друга
+    names = unique_names(os.path.splitext(os.path.basename(path))[0] for path in paths)
+    return [(name, path, None, None) for name, path in zip(names, paths)]
+
+
+def load_prelude(path):
+    """Константы прелюдии: JSON-объект с разделом "const" или просто объект констант."""
+    with open(path) as f:
+        data = json.load(f)
+    return data.get('const', data)
+
+
+def init_worker(settings):
+    """Построить таблицу констант прелюдии один раз на рабочий процесс."""
+    global _prelude, _settings
+    _settings = settings
+    translator = ConfigTranslator()
+    for name, value in settings['prelude'].items():
+        translator.parse_constant(name, value)
+    _prelude = translator.constants
+
+
+def read_document(path, offset):
+    if offset is None:
+        with open(path) as f:
+            return json.load(f)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+
+def run_job(job):
+    """Перевести один документ; ошибки попадают в отчёт и не прерывают пакет."""
+    name, path, line_number, offset = job
+    report = {'input': path, 'status': 'ok'}
+    if line_number is not None:
+        report['line'] = line_number
+
+    try:
+        start = time.perf_counter()
+        translator = ConfigTranslator()
+        # Константы документа перекрывают прелюдию, сама прелюдия не изменяется
+        translator.constants = ConstantTable(parent=_prelude)
+        translated_text = translator.translate(read_document(path, offset))
+        output_path = os.path.join(_settings['output_dir'], name + '.txt')
+        with open(output_path, 'w') as f:
+            f.write(translated_text)
+        report['seconds'] = time.perf_counter() - start
+        report['output'] = output_path
+    except Exception as e:
+        report['status'] = 'error'
+        report['error'] = f"{type(e).__name__}: {e}"
+
+    return report
+
+
+def run_batch(jobs, output_dir, prelude=None, workers=None):
+    """Перевести набор документов в пуле процессов и вернуть сводку."""
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {'output_dir': output_dir, 'prelude': prelude or {}}
+
+    return write_summary(output_dir, run_pool(run_job, jobs, init_worker, settings, workers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch JSON to configuration language translator")
+    parser.add_argument("source", help="Directory with .json files, a .jsonl file or a manifest with one path per line")
+    parser.add_argument("output_dir", help="Directory for translated files and summary.json")
+    parser.add_argument("--prelude", help="JSON file with constants shared by all documents")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    prelude = load_prelude(args.prelude) if args.prelude else None
+    summary = run_batch(collect_inputs(args.source), args.output_dir, prelude=prelude, workers=args.workers)
+    print(f"Translated {summary['total']} documents in {summary['seconds']:.2f}s: "
+          f"{summary['succeeded']} succeeded, {summary['failed']} failed")
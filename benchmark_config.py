@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from benchmark_vm import DEFAULT_THRESHOLD, compare
+from config_reader import loads
+from config_translator import EXPRESSION_KEYS, ConfigTranslator
+
+# Разделы конфигурации, время которых суммируется в отдельные фазы
+PHASES = {
+    'comments': ("comment", "multi_comment"),
+    'constants': ("const",),
+    'expressions': ("array_value",) + EXPRESSION_KEYS,
+}
+
+
+def nested_list(depth, rng):
+    """Список глубины depth из чисел и строк."""
+    items = [rng.randrange(1000), f"item{rng.randrange(1000)}"]
+    if depth > 1:
+        items.append(nested_list(depth - 1, rng))
+    return items
+
+
+def generate_config(constants=1000, list_depth=3, chain=100, comment_lines=1000, seed=0):
+    """Сгенерировать конфигурацию заданного размера и формы.
+
+    constants — число простых констант (числа, строки, вложенные списки),
+    chain — длина цепочки констант-выражений, ссылающихся друг на друга,
+    comment_lines — число строк многострочного комментария.
+    """
+    rng = random.Random(seed)
+    const = {}
+    for i in range(constants):
+        kind = i % 3
+        if kind == 0:
+            const[f"num{i}"] = rng.randrange(1 << 16)
+        elif kind == 1:
+            const[f"str{i}"] = f"value {rng.randrange(1 << 16)}"
+        else:
+            const[f"list{i}"] = nested_list(list_depth, rng)
+
+    # Цепочка link0 -> link1 -> ... объявлена от начала к концу, то есть со ссылками вперёд
+    for i in range(chain):
+        const[f"link{i}"] = f"${{+ link{i + 1} {rng.randrange(100)}}}"
+    const[f"link{chain}"] = 1
+
+    return {
+        "comment": "Generated configuration",
+        "multi_comment": [f"Line {i} of the generated comment" for i in range(comment_lines)],
+        "const": const,
+        "array_value": "list(1, 2, 3)",
+        "expression_addition": "${+ link0 1}",
+        "expression_subtraction": "${- link0 ${* 2 3}}",
+        "expression_multiplication": "${* link0 2}",
+        "concat_example": "${concat str1 [[ - ]] list2}" if constants > 2 else "${concat [[a]] [[b]]}",
+        "ord_example": "${ord str1}" if constants > 1 else "${ord [[A]]}",
+    }
+
+
+def translate_phases(config):
+    """Перевести конфигурацию, замеряя время каждой фазы; вернуть (текст, времена)."""
+    translator = ConfigTranslator()
+    timings = dict.fromkeys(PHASES, 0.0)
+    parts = []
+    for phase, keys in PHASES.items():
+        start = time.perf_counter()
+        for key in keys:
+            if key in config:
+                parts.extend(translator.render_section(key, config[key]))
+        timings[phase] += time.perf_counter() - start
+    return ''.join(parts), timings
+
+
+def stream_translate(input_path):
+    """Потоковый перевод файла; вывод отбрасывается, чтобы не держать его в памяти."""
+    with open(input_path) as input_file, open(os.devnull, 'w') as output_file:
+        ConfigTranslator().translate_stream(input_file, output_file)
+
+
+def run_benchmark(constants=1000, list_depth=3, chain=100, comment_lines=1000, seed=0, repeat=3):
+    """Замерить время и пиковую память перевода, потокового перевода и обратного чтения.
+
+    Каждое время — лучшее из repeat запусков, чтобы сгладить шум.
+    """
+    config = generate_config(constants, list_depth, chain, comment_lines, seed)
+    text = json.dumps(config)
+    results = {
+        'shape': {'constants': constants, 'list_depth': list_depth, 'chain': chain,
+                  'comment_lines': comment_lines, 'input_bytes': len(text)},
+    }
+    timings = {}
+
+    def record(name, seconds):
+        timings[name] = min(timings.get(name, seconds), seconds)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, 'input.json')
+        with open(input_path, 'w') as f:
+            f.write(text)
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output, phases = translate_phases(config)
+            record('translate_seconds', time.perf_counter() - start)
+            for phase, seconds in phases.items():
+                record(f'{phase}_seconds', seconds)
+
+            start = time.perf_counter()
+            stream_translate(input_path)
+            record('stream_seconds', time.perf_counter() - start)
+
+            start = time.perf_counter()
+            loads(output)
+            record('read_seconds', time.perf_counter() - start)
+
+        results.update(timings)
+        results['translate_bytes_per_second'] = len(output) / timings['translate_seconds']
+
+        # Пиковая память замеряется отдельно: tracemalloc заметно замедляет выполнение
+        tracemalloc.start()
+        ConfigTranslator().translate(config)
+        results['translate.peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        stream_translate(input_path)
+        results['stream.peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return results
+
+
+def append_history(path, results):
+    """Дописать результаты с отметкой времени в файл истории (JSON Lines)."""
+    record = {'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'), **results}
+    with open(path, 'a') as f:
+        f.write(json.dumps(record))
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Configuration translator benchmark")
+    parser.add_argument("--constants", type=int, default=10000, help="Number of plain constants (default: 10000)")
+    parser.add_argument("--list-depth", type=int, default=3, help="Nesting depth of list constants (default: 3)")
+    parser.add_argument("--chain", type=int, default=1000, help="Length of the expression reference chain")
+    parser.add_argument("--comment-lines", type=int, default=10000, help="Lines in the multi-line comment")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the config generator")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the best is kept (default: 3)")
+    parser.add_argument("--baseline", default="benchmark_config_baseline.json", help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--history", help="Append the results to this JSON Lines file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative regression before failing (default: 0.2)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.constants, args.list_depth, args.chain, args.comment_lines, args.seed,
+                            args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.history:
+        append_history(args.history, results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('shape') != results['shape']:
+        print("Warning: baseline was recorded with a different config shape.")
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from assembler import Assembler
+from interpreter import Interpreter, decode
+from log_formats import write_result
+
+# Доли команд в генерируемой программе по умолчанию
+DEFAULT_MIX = {'LOAD_CONST': 0.25, 'READ_MEM': 0.25, 'WRITE_MEM': 0.25, 'BITREVERSE': 0.25}
+
+EXECUTION_MODES = ('scalar', 'batch', 'jit')
+
+# Метрики, для которых большее значение лучше; для остальных лучше меньшее
+HIGHER_IS_BETTER = ('_per_second',)
+
+DEFAULT_THRESHOLD = 0.2  # Допустимое ухудшение относительно базовой линии (20%)
+
+
+def parse_mix(text):
+    """Разобрать смесь команд вида 'LOAD_CONST=1,BITREVERSE=3'."""
+    mix = {}
+    for item in text.split(','):
+        name, weight = item.split('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown command in mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def generate_program(size, mix=None, memory_size=1024, seed=0):
+    """Сгенерировать текст программы из size команд с заданной смесью."""
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=size)
+    lines = []
+    for name in names:
+        if name == 'LOAD_CONST':
+            # C у LOAD_CONST ограничен 1024 ячейками
+            lines.append(f"LOAD_CONST {rng.randrange(1 << 13)} {rng.randrange(min(memory_size, 1024))}")
+        else:
+            lines.append(f"{name} {rng.randrange(memory_size)} {rng.randrange(memory_size)}")
+    return '\n'.join(lines) + '\n'
+
+
+def run_benchmark(size, mix=None, memory_size=1024, modes=EXECUTION_MODES, seed=0):
+    """Замерить скорость ассемблирования, выполнения и выгрузки результата."""
+    results = {'size': size, 'memory_size': memory_size}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asm_path = os.path.join(tmp_dir, 'bench.asm')
+        bin_path = os.path.join(tmp_dir, 'bench.bin')
+        with open(asm_path, 'w') as f:
+            f.write(generate_program(size, mix, memory_size, seed))
+
+        start = time.perf_counter()
+        Assembler().assemble(asm_path, bin_path)
+        results['assemble_lines_per_second'] = size / (time.perf_counter() - start)
+
+        with open(bin_path, 'rb') as f:
+            binary_data = f.read()
+
+        start = time.perf_counter()
+        program = decode(binary_data)
+        results['decode_instructions_per_second'] = size / (time.perf_counter() - start)
+
+        for mode in modes:
+            # Первый запуск включает компиляцию (для jit), второй — установившийся режим
+            start = time.perf_counter()
+            Interpreter(memory_size=memory_size, batch=mode == 'batch', jit=mode == 'jit').execute(program)
+            results[f'{mode}.first_run_seconds'] = time.perf_counter() - start
+
+            interpreter = Interpreter(memory_size=memory_size, batch=mode == 'batch', jit=mode == 'jit')
+            start = time.perf_counter()
+            interpreter.execute(program)
+            results[f'{mode}.execute_instructions_per_second'] = size / (time.perf_counter() - start)
+
+            # Пиковая память замеряется отдельно: tracemalloc заметно замедляет выполнение
+            tracemalloc.start()
+            Interpreter(memory_size=memory_size, batch=mode == 'batch', jit=mode == 'jit').execute(decode(binary_data))
+            results[f'{mode}.peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        start = time.perf_counter()
+        write_result(os.path.join(tmp_dir, 'result.yaml'), (0, memory_size), interpreter.snapshot_range(0, memory_size))
+        results['result_dump_seconds'] = time.perf_counter() - start
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Список описаний метрик, ухудшившихся сильнее порога относительно базовой линии."""
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not isinstance(base, (int, float)) or base <= 0 or name in ('size', 'memory_size'):
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            change = (base - value) / base
+        else:
+            change = (value - base) / base
+        if change > threshold:
+            regressions.append(f"{name}: {value:.6g} vs baseline {base:.6g} ({change:+.0%} worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assembler/interpreter benchmark")
+    parser.add_argument("--size", type=int, default=100000, help="Number of generated commands (default: 100000)")
+    parser.add_argument("--mix", type=parse_mix, default=None,
+                        help="Command weights, e.g. 'LOAD_CONST=1,READ_MEM=1,WRITE_MEM=1,BITREVERSE=1'")
+    parser.add_argument("--memory-size", type=int, default=1024, help="Number of memory cells (default: 1024)")
+    parser.add_argument("--modes", nargs='+', choices=EXECUTION_MODES, default=list(EXECUTION_MODES),
+                        help="Interpreter modes to measure")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the program generator")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative regression before failing (default: 0.2)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.size, args.mix, args.memory_size, args.modes, args.seed)
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if (baseline.get('size'), baseline.get('memory_size')) != (args.size, args.memory_size):
+        print("Warning: baseline was recorded with a different program size or memory size.")
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
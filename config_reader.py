@@ -0,0 +1,262 @@
+import argparse
+import json
+import marshal
+import os
+
+# Версия формата файла кэша; меняется при изменении структуры результата
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.cache'
+
+_DIGITS = frozenset('0123456789')
+
+
+class ConfigReader:
+    """Однопроходный разбор выходного языка транслятора в структуры Python.
+
+    Результат повторяет форму входного JSON: "comment", "multi_comment",
+    "const" и остальные ключи со значениями. Числа становятся int, [[строки]] — str,
+    list(...) и [...] — списками. Несколько комментариев "||" собираются в список.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.line = 1
+
+    def error(self, message):
+        raise ValueError(f"Line {self.line}: {message}")
+
+    def read(self):
+        result = {}
+        text = self.text
+        while self.pos < len(text):
+            if text.startswith('||', self.pos):
+                self.comment(result)
+            elif text.startswith('=begin', self.pos):
+                self.block(result)
+            elif text[self.pos] in '\r\n':
+                self.end_of_line()
+            else:
+                if text.startswith('const ', self.pos):
+                    self.pos += len('const ')
+                    name = self.name()
+                    result.setdefault('const', {})[name] = self.value()
+                else:
+                    name = self.name()
+                    result[name] = self.value()
+                self.skip_spaces()
+                self.end_of_line()
+        return result
+
+    def rest_of_line(self):
+        end = self.text.find('\n', self.pos)
+        if end == -1:
+            end = len(self.text)
+        line = self.text[self.pos:end]
+        self.pos = end
+        self.end_of_line()
+        return line[:-1] if line.endswith('\r') else line
+
+    def end_of_line(self):
+        if self.pos >= len(self.text):
+            return
+        if self.text.startswith('\r\n', self.pos):
+            self.pos += 2
+        elif self.text[self.pos] == '\n':
+            self.pos += 1
+        else:
+            self.error(f"unexpected '{self.text[self.pos]}'")
+        self.line += 1
+
+    def comment(self, result):
+        self.pos += 2
+        line = self.rest_of_line()
+        comment = line[1:] if line.startswith(' ') else line
+        if 'comment' not in result:
+            result['comment'] = comment
+        elif isinstance(result['comment'], list):
+            result['comment'].append(comment)
+        else:
+            result['comment'] = [result['comment'], comment]
+
+    def block(self, result):
+        self.rest_of_line()
+        lines = []
+        while self.pos < len(self.text):
+            line = self.rest_of_line()
+            if line == '=cut':
+                result.setdefault('multi_comment', []).extend(lines)
+                return
+            lines.append(line)
+        self.error("=begin without =cut")
+
+    def skip_spaces(self):
+        text = self.text
+        while self.pos < len(text) and text[self.pos] in ' \t':
+            self.pos += 1
+
+    def name(self):
+        """Имя до ' = '."""
+        end = self.text.find(' = ', self.pos)
+        newline = self.text.find('\n', self.pos)
+        if end == -1 or newline != -1 and newline < end:
+            self.error("expected 'name = value'")
+        name = self.text[self.pos:end].strip()
+        self.pos = end + 3
+        return name
+
+    def value(self, bare_until=None):
+        """Значение: число, [[строка]], list(...), [...], 'строка' или, внутри списка, слово."""
+        self.skip_spaces()
+        text = self.text
+        if self.pos >= len(text):
+            self.error("value expected")
+        char = text[self.pos]
+
+        if text.startswith('[[', self.pos):
+            return self.string(bare_until)
+        if text.startswith('list(', self.pos):
+            self.pos += len('list(')
+            return self.items(')')
+        if char == '[':
+            self.pos += 1
+            return self.items(']')
+        if char in '\'"':
+            return self.quoted(char)
+        if char == '-' or char in _DIGITS:
+            start = self.pos
+            self.pos += 1
+            while self.pos < len(text) and text[self.pos] in _DIGITS:
+                self.pos += 1
+            if bare_until is None or self.pos == len(text) or text[self.pos] in bare_until + ' \t':
+                try:
+                    return int(text[start:self.pos])
+                except ValueError:
+                    pass
+            self.pos = start
+        if bare_until is None:
+            self.error(f"unexpected '{char}'")
+
+        # Строка без кавычек внутри list(...): до запятой или закрывающей скобки
+        start = self.pos
+        while self.pos < len(text) and text[self.pos] not in bare_until and text[self.pos] != '\n':
+            self.pos += 1
+        return text[start:self.pos].strip()
+
+    def string(self, bare_until=None):
+        """[[строка]]; вложенные пары [[...]] (например, после concat со списком) входят в строку.
+
+        Строка может оканчиваться на ']' (например, [[arr[0]]]), поэтому без открытых вложенных
+        пар её закрывает первая ']]', за которой идёт конец значения: конец строки файла или,
+        внутри списка, ',' или закрывающая скобка.
+        """
+        text = self.text
+        start = self.pos + 2
+        pos = start
+        depth = 1
+        while True:
+            end = text.find(']]', pos)
+            if end == -1:
+                self.error("unterminated [[string]]")
+            opening = text.find('[[', pos, end)
+            if opening != -1:
+                depth += 1
+                pos = opening + 2
+            elif depth > 1:
+                depth -= 1
+                pos = end + 2
+            elif self.value_ends(end + 2, bare_until):
+                break
+            else:
+                pos = end + 1
+        value = text[start:end]
+        self.line += value.count('\n')
+        self.pos = end + 2
+        return value
+
+    def value_ends(self, pos, bare_until):
+        """Заканчивается ли значение в позиции pos (с учётом пробелов после него)."""
+        text = self.text
+        while pos < len(text) and text[pos] in ' \t':
+            pos += 1
+        if pos == len(text):
+            return True
+        return text[pos] in ('\r\n' if bare_until is None else bare_until)
+
+    def items(self, closing):
+        items = []
+        self.skip_spaces()
+        if self.text.startswith(closing, self.pos):
+            self.pos += 1
+            return items
+        while True:
+            items.append(self.value(bare_until=',' + closing))
+            self.skip_spaces()
+            if self.pos >= len(self.text):
+                self.error(f"expected '{closing}'")
+            char = self.text[self.pos]
+            self.pos += 1
+            if char == closing:
+                return items
+            if char != ',':
+                self.error(f"expected ',' or '{closing}'")
+
+    def quoted(self, quote):
+        """Строка в кавычках, как её выводит repr() (array_value со списком)."""
+        chars = []
+        self.pos += 1
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            if char == quote:
+                self.pos += 1
+                return ''.join(chars)
+            if char == '\\' and self.pos + 1 < len(text):
+                self.pos += 1
+                char = {'n': '\n', 't': '\t', 'r': '\r'}.get(text[self.pos], text[self.pos])
+            chars.append(char)
+            self.pos += 1
+        self.error("unterminated quoted string")
+
+
+def loads(text):
+    """Разобрать текст выходного языка в словарь."""
+    return ConfigReader(text).read()
+
+
+def load(path, cache=True):
+    """Прочитать файл конфигурации; с cache=True результат хранится рядом в path + '.cache'.
+
+    Кэш проверяется по размеру и времени изменения файла, поэтому повторная загрузка
+    не разбирает текст заново.
+    """
+    stat = os.stat(path)
+    key = (CACHE_VERSION, stat.st_size, stat.st_mtime_ns)
+    cache_path = path + CACHE_SUFFIX
+    if cache:
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_key, data = marshal.load(f)
+            if tuple(cached_key) == key:
+                return data
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    with open(path, encoding='utf-8', newline='') as f:
+        data = loads(f.read())
+
+    if cache:
+        # Запись через временный файл: параллельные загрузки не увидят неполный кэш
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump((key, data), f)
+        os.replace(tmp_path, cache_path)
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read a translated configuration back as JSON")
+    parser.add_argument("input", help="Translated configuration file (e.g., output.txt)")
+    parser.add_argument("--no-cache", action="store_true", help=f"Do not read or write the {CACHE_SUFFIX} file")
+    args = parser.parse_args()
+    print(json.dumps(load(args.input, cache=not args.no_cache), indent=4, ensure_ascii=False))
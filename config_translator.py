@@ -1,10 +1,420 @@
+import argparse
 import json
+import os
 import re
+import shutil
 import sys
+import tempfile
+import time
+from functools import lru_cache
+
+# Лексемы выражений: "${", "}", строка [[...]], целое число, имя или операция
+_TOKEN = re.compile(r'\s*(?:(\$\{)|(\})|\[\[(.*?)\]\]|(-?\d+)(?=[\s}]|$)|([^\s}]+))', re.S)
+
+BINARY_OPERATIONS = {
+    '+': lambda x, y: x + y,
+    '-': lambda x, y: x - y,
+    '*': lambda x, y: x * y,
+}
+
+# Ключи конфигурации, значения которых вычисляются как выражения
+EXPRESSION_KEYS = (
+    "expression_addition",
+    "expression_subtraction",
+    "expression_multiplication",
+    "concat_example",
+    "ord_example",
+)
+
+# Порядок разделов в выходном файле
+SECTIONS = ("comment", "multi_comment", "const", "array_value") + EXPRESSION_KEYS
+
+READ_CHUNK = 1 << 16  # Размер блока чтения JSON в потоковом режиме
+WRITE_BUFFER = 1 << 16  # Размер буфера записи выходного файла
+SPOOL_SIZE = 1 << 20  # Раздел, пришедший не по порядку, хранится в памяти до этого размера
+
+
+def tokenize(expr):
+    """Разбить выражение на лексемы (вид, значение) за один проход."""
+    tokens = []
+    pos = 0
+    end = len(expr.rstrip())
+    while pos < end:
+        match = _TOKEN.match(expr, pos)
+        if not match:
+            raise ValueError(f"Invalid expression format: {expr}")
+        opening, closing, string, number, name = match.groups()
+        if opening:
+            tokens.append(('open', opening))
+        elif closing:
+            tokens.append(('close', closing))
+        elif string is not None:
+            tokens.append(('str', string))
+        elif number is not None:
+            tokens.append(('num', int(number)))
+        else:
+            tokens.append(('name', name))
+        pos = match.end()
+    return tokens
+
+
+def parse(expr):
+    """Построить дерево выражения: ('call', op, [аргументы]), ('num', n), ('str', s), ('name', x)."""
+    tokens = tokenize(expr)
+    node, pos = _parse_call(tokens, 0, expr)
+    if pos != len(tokens):
+        raise ValueError(f"Invalid expression format: {expr}")
+    return node
+
+
+def _parse_call(tokens, pos, expr):
+    if pos + 1 >= len(tokens) or tokens[pos][0] != 'open' or tokens[pos + 1][0] != 'name':
+        raise ValueError(f"Invalid expression format: {expr}")
+    op = tokens[pos + 1][1]
+    if op not in BINARY_OPERATIONS and op not in ('concat', 'ord'):
+        raise ValueError(f"Unsupported operation: {op}")
+
+    args = []
+    pos += 2
+    while pos < len(tokens) and tokens[pos][0] != 'close':
+        if tokens[pos][0] == 'open':
+            arg, pos = _parse_call(tokens, pos, expr)
+        else:
+            arg, pos = tokens[pos], pos + 1
+        args.append(arg)
+    if pos == len(tokens):
+        raise ValueError(f"Invalid expression format: {expr}")
+
+    if op in BINARY_OPERATIONS and len(args) != 2 or op == 'ord' and len(args) != 1 or not args:
+        raise ValueError(f"Wrong number of arguments for {op}: {expr}")
+    return ('call', op, args), pos + 1
+
+
+def _compile_node(node, strict):
+    """Превратить узел дерева в функцию от таблицы констант.
+
+    strict: неизвестное имя — ошибка (арифметика); иначе имя берётся как текст (concat, ord).
+    """
+    kind = node[0]
+    if kind in ('num', 'str'):
+        value = node[1]
+        return lambda constants: value
+    if kind == 'name':
+        # Обращение через [] позволяет таблице констант вычислять значения по требованию
+        name = node[1]
+        if strict:
+            def resolve(constants):
+                try:
+                    return constants[name]
+                except KeyError:
+                    raise ValueError(f"Undefined constant or invalid value: {name}") from None
+            return resolve
+
+        def resolve_or_text(constants):
+            try:
+                return constants[name]
+            except KeyError:
+                return name
+        return resolve_or_text
+
+    op, args = node[1], node[2]
+    if op in BINARY_OPERATIONS:
+        apply = BINARY_OPERATIONS[op]
+        left, right = (_compile_node(arg, True) for arg in args)
+        return lambda constants: apply(left(constants), right(constants))
+
+    parts = [_compile_node(arg, False) for arg in args]
+    if op == 'concat':
+        return lambda constants: ''.join(str(part(constants)) for part in parts)
+
+    def ord_func(constants):
+        value = parts[0](constants)
+        if isinstance(value, str) and len(value) > 0:
+            return ord(value[0])
+        raise ValueError(f"ord() requires a non-empty string, got: {value}")
+    return ord_func
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(expr):
+    """Скомпилировать выражение в функцию от таблицы констант (с кэшем по тексту)."""
+    return _compile_node(parse(expr), True)
+
+
+@lru_cache(maxsize=4096)
+def expression_names(expr):
+    """Имена, на которые ссылается выражение (кандидаты в зависимости)."""
+    names = []
+    stack = [parse(expr)]
+    while stack:
+        node = stack.pop()
+        if node[0] == 'name':
+            names.append(node[1])
+        elif node[0] == 'call':
+            stack.extend(node[2])
+    return tuple(names)
+
+
+def is_expression(value):
+    return isinstance(value, str) and value.lstrip().startswith("${")
+
+
+def format_value(value):
+    """Значение в синтаксисе выходного языка: числа, [[строки]], list(...)."""
+    if isinstance(value, int):
+        return str(value)
+    elif isinstance(value, str):
+        return f"[[{value}]]"
+    elif isinstance(value, list):
+        return f"list({', '.join(format_value(item) for item in value)})"
+    else:
+        raise ValueError(f"Unsupported value type: {type(value)}")
+
+
+class ConstantTable(dict):
+    """Таблица констант с ленивым вычислением.
+
+    Числа и строки заносятся сразу. Списки и константы-выражения ("${...}")
+    хранятся в definitions и вычисляются при первом обращении — после всех
+    констант, от которых они зависят, — затем запоминаются. Поэтому константа
+    может ссылаться на объявленную позже, а циклы сообщаются ошибкой.
+
+    parent — общая таблица (например, прелюдия констант), к которой
+    обращаются за именами, не объявленными в этой таблице.
+    """
+
+    def __init__(self, values=(), parent=None):
+        super().__init__(values)
+        self.definitions = {}
+        self.parent = parent
+
+    def define(self, name, value):
+        self.pop(name, None)
+        self.definitions.pop(name, None)
+        if isinstance(value, list) or is_expression(value):
+            self.definitions[name] = value
+        else:
+            self[name] = value
+
+    def dependencies(self, name):
+        value = self.definitions[name]
+        if not is_expression(value):
+            return ()
+        return [dep for dep in expression_names(value.strip()) if dep in self.definitions]
+
+    def evaluate(self, name):
+        value = self.definitions[name]
+        if isinstance(value, list):
+            return format_value(value)
+        return compile_expression(value.strip())(self)
+
+    def __missing__(self, name):
+        if name not in self.definitions:
+            if self.parent is None:
+                raise KeyError(name)
+            return self.parent[name]
+
+        # Обход зависимостей в глубину без рекурсии: длинные цепочки ссылок
+        # не упираются в предел стека, каждая константа вычисляется один раз
+        chain = [name]
+        on_chain = {name}
+        pending = [iter(self.dependencies(name))]
+        while chain:
+            dep = next(pending[-1], None)
+            if dep is None:
+                done = chain.pop()
+                pending.pop()
+                on_chain.discard(done)
+                self[done] = self.evaluate(done)
+            elif dep in on_chain:
+                cycle = chain[chain.index(dep):] + [dep]
+                raise ValueError(f"Cyclic constant reference: {' -> '.join(cycle)}")
+            elif dep not in self:
+                chain.append(dep)
+                on_chain.add(dep)
+                pending.append(iter(self.dependencies(dep)))
+        return dict.__getitem__(self, name)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def remove(self, name):
+        self.pop(name, None)
+        self.definitions.pop(name, None)
+
+    def invalidate(self, name):
+        """Забыть вычисленное значение, чтобы оно было пересчитано при обращении."""
+        if name in self.definitions:
+            self.pop(name, None)
+
+
+class JsonEventReader:
+    """Инкрементальный разбор JSON-объекта верхнего уровня, читаемого блоками.
+
+    Члены "const" и строки "multi_comment" выдаются по одному, остальные
+    значения верхнего уровня — целиком.
+    """
+
+    def __init__(self, f, chunk_size=READ_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """Дочитать следующий блок, отбросив разобранную часть буфера."""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Следующий значимый символ ('' в конце файла)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON: expected '{char}' at position {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Разобрать одно JSON-значение, дочитывая блоки, пока оно не будет полным."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # Значение в самом конце буфера (например, число) может продолжаться в следующем блоке
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    def separator(self, closing):
+        """Пропустить ',' между элементами; вернуть True на закрывающей скобке."""
+        char = self.peek()
+        self.pos += 1
+        if char == closing:
+            return True
+        if char != ',':
+            raise ValueError(f"Invalid JSON: expected ',' or '{closing}' at position {self.pos - 1}")
+        return False
+
+    def events(self):
+        """События (ключ, вид, данные), где вид — 'value', 'begin', 'item' или 'end'."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if key == "const" and self.peek() == '{':
+                yield from self.members(key)
+            elif key == "multi_comment" and self.peek() == '[':
+                yield from self.elements(key)
+            else:
+                yield key, 'value', self.value()
+            if self.separator('}'):
+                return
+
+    def members(self, key):
+        self.expect('{')
+        yield key, 'begin', None
+        if self.peek() == '}':
+            self.pos += 1
+        else:
+            while True:
+                name = self.value()
+                self.expect(':')
+                yield key, 'item', (name, self.value())
+                if self.separator('}'):
+                    break
+        yield key, 'end', None
+
+    def elements(self, key):
+        self.expect('[')
+        yield key, 'begin', None
+        if self.peek() == ']':
+            self.pos += 1
+        else:
+            while True:
+                yield key, 'item', self.value()
+                if self.separator(']'):
+                    break
+        yield key, 'end', None
+
+
+class SectionWriter:
+    """Запись разделов в порядке SECTIONS при произвольном порядке ключей во входе.
+
+    Раздел пишется прямо в выходной файл, если все предыдущие уже записаны;
+    иначе он копится во временном файле и дописывается, когда подойдёт очередь.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.written = set()
+        self.pending = {}
+
+    def open(self, key):
+        index = SECTIONS.index(key)
+        if all(i in self.written for i in range(index)):
+            return self.out
+        return tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, mode='w+', encoding='utf-8')
+
+    def close(self, key, target):
+        index = SECTIONS.index(key)
+        if target is self.out:
+            self.written.add(index)
+        else:
+            self.pending[index] = target
+        self.flush_ready()
+
+    def flush_ready(self, final=False):
+        """Дописать отложенные разделы, перед которыми больше нет пропусков."""
+        for index in range(len(SECTIONS)):
+            if index in self.written:
+                continue
+            if index in self.pending:
+                spool = self.pending.pop(index)
+                spool.seek(0)
+                shutil.copyfileobj(spool, self.out)
+                spool.close()
+                self.written.add(index)
+            elif final:
+                self.written.add(index)  # Раздела нет во входных данных
+            else:
+                return
+
 
 class ConfigTranslator:
     def __init__(self):
-        self.constants = {}
+        self.constants = ConstantTable()
+
+    @property
+    def constants(self):
+        return self._constants
+
+    @constants.setter
+    def constants(self, values):
+        self._constants = values if isinstance(values, ConstantTable) else ConstantTable(values)
 
     def validate_name(self, name):
         if not re.match(r'^[a-zA-Z][a-zA-Z0-9]*$', name):
@@ -13,26 +423,15 @@ class ConfigTranslator:
 
     def parse_constant(self, name, value):
         name = self.validate_name(name)  # Validate the name format
-        if isinstance(value, int) or isinstance(value, str):
-            self.constants[name] = value
-        elif isinstance(value, list):
-            self.constants[name] = self.parse_list(value)
-        else:
+        if not isinstance(value, (int, str, list)):
             raise ValueError(f"Unsupported constant value: {value}")
+        self.constants.define(name, value)
 
     def parse_list(self, items):
-        parsed_items = [self.parse_value(item) for item in items]
-        return f"list({', '.join(parsed_items)})"
+        return format_value(list(items))
 
     def parse_value(self, value):
-        if isinstance(value, int):
-            return str(value)
-        elif isinstance(value, str):
-            return f"[[{value}]]"
-        elif isinstance(value, list):
-            return self.parse_list(value)
-        else:
-            raise ValueError(f"Unsupported value type: {type(value)}")
+        return format_value(value)
 
     def concat(self, *args):
         return ''.join(str(self.constants.get(arg, arg)) for arg in args)
@@ -44,108 +443,262 @@ class ConfigTranslator:
         raise ValueError(f"ord() requires a non-empty string, got: {value}")
 
     def parse_expression(self, expr):
-        match = re.match(r'\$\{([+\-*]|concat|ord)\s+([^\}]+)\}', expr)
-        if not match:
-            raise ValueError(f"Invalid expression format: {expr}")
+        """Вычислить выражение ${...} по таблице констант (разбор кэшируется)."""
+        return compile_expression(expr.strip())(self.constants)
 
-        op, args = match.groups()
-        args = args.split()
+    def render_value(self, value):
+        """Вывести вычисленное значение: строки в [[...]], числа как есть."""
+        if isinstance(value, str):
+            return f"[[{value}]]"
+        return str(value)
 
-        def resolve_value(arg):
-            if arg in self.constants:
-                return self.constants[arg]
-            elif arg.isdigit():
-                return int(arg)
-            else:
-                raise ValueError(f"Undefined constant or invalid value: {arg}")
-
-        if op == '+':
-            return resolve_value(args[0]) + resolve_value(args[1])
-        elif op == '-':
-            return resolve_value(args[0]) - resolve_value(args[1])
-        elif op == '*':
-            return resolve_value(args[0]) * resolve_value(args[1])
-        elif op == "concat":
-            return self.concat(*args)
-        elif op == "ord":
-            return self.ord_func(args[0])
+    def render_constant(self, name, value):
+        """Строка объявления константы; значение константы-выражения вычисляется."""
+        if isinstance(value, int):
+            return f"const {name} = {value}\n"
+        elif isinstance(value, str):
+            if is_expression(value):
+                return f"const {name} = {self.render_value(self.constants[name])}\n"
+            return f"const {name} = [[{value}]]\n"
+        list_values = ', '.join(map(str, value))
+        return f"const {name} = list({list_values})\n"
+
+    def render_section(self, key, value):
+        """Строки выходного файла для одного раздела конфигурации."""
+        if key == "comment":
+            # Однострочные комментарии
+            yield f"|| {value}\n"
+        elif key == "multi_comment":
+            # Многострочные комментарии
+            yield "=begin\n"
+            for line in value:
+                yield f"{line}\n"
+            yield "=cut\n"
+        elif key == "const":
+            # Обработка констант: сначала объявляются все, чтобы допускать ссылки вперёд
+            for name, item in value.items():
+                self.parse_constant(name, item)
+            for name, item in value.items():
+                yield self.render_constant(name, item)
+        elif key == "array_value":
+            # Обработка массивов
+            yield f"array_value = {value}\n"
         else:
-            raise ValueError(f"Unsupported operation: {op}")
+            # Выражения, конкатенация и функция ord()
+            yield f"{key} = {self.render_value(self.parse_expression(value))}\n"
+
+    def translate(self, config):
+        return ''.join(self.iter_lines(config))
+
+    def iter_lines(self, config):
+        for key in SECTIONS:
+            if key in config:
+                yield from self.render_section(key, config[key])
+
+    def translate_stream(self, input_file, output_file, chunk_size=READ_CHUNK):
+        """Потоковый перевод: JSON разбирается по событиям, строки сразу пишутся в output_file.
 
+        Выражения, встретившиеся раньше констант, откладываются до конца входа.
+        Результат совпадает с translate().
+        """
+        writer = SectionWriter(output_file)
+        expressions = {}
+        deferred = []
+        target = None
+
+        for key, kind, data in JsonEventReader(input_file, chunk_size).events():
+            if key not in SECTIONS:
+                continue
+            if kind == 'value':
+                if key in EXPRESSION_KEYS:
+                    expressions[key] = data
+                    continue
+                target = writer.open(key)
+                target.writelines(self.render_section(key, data))
+                writer.close(key, target)
+            elif kind == 'begin':
+                target = writer.open(key)
+                if key == "multi_comment":
+                    target.write("=begin\n")
+            elif kind == 'item':
+                if key == "const":
+                    # Константы после первой константы-выражения ждут конца раздела:
+                    # выражение может ссылаться на объявленные ниже
+                    self.parse_constant(*data)
+                    if deferred or is_expression(data[1]):
+                        deferred.append(data)
+                    else:
+                        target.write(self.render_constant(*data))
+                else:
+                    target.write(f"{data}\n")
+            elif kind == 'end':
+                if key == "multi_comment":
+                    target.write("=cut\n")
+                else:
+                    target.writelines(self.render_constant(*item) for item in deferred)
+                    deferred = []
+                writer.close(key, target)
+
+        # Выражения вычисляются, когда известны все константы
+        for key in EXPRESSION_KEYS:
+            if key in expressions:
+                target = writer.open(key)
+                target.writelines(self.render_section(key, expressions[key]))
+                writer.close(key, target)
+        writer.flush_ready(final=True)
+
+
+def references(value):
+    """Имена, от которых зависит значение константы или выражения."""
+    return expression_names(value.strip()) if is_expression(value) else ()
+
+
+_MISSING = object()
+
+
+class IncrementalTranslator:
+    """Повторный перевод конфигурации, меняющейся по несколько ключей за раз.
+
+    Хранит предыдущий вход, таблицу констант и готовые фрагменты вывода; при
+    обновлении заново выводятся только изменённые ключи и всё, что от них
+    зависит. Результат совпадает с ConfigTranslator().translate(config).
+    Вложенные значения конфигурации не должны изменяться на месте между вызовами.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.translator = ConfigTranslator()
+        self.previous = {}
+        self.fragments = {}  # Раздел -> готовый текст (кроме "const")
+        self.const_lines = {}  # Имя константы -> строка объявления
+        self.dependents = {}  # Имя -> константы и разделы, ссылающиеся на него
 
     def translate(self, config):
-        output = ""
-
-        # Однострочные комментарии
-        if "comment" in config:
-            output += f"|| {config['comment']}\n"
-
-        # Многострочные комментарии
-        if "multi_comment" in config:
-            output += "=begin\n"
-            for line in config["multi_comment"]:
-                output += f"{line}\n"
-            output += "=cut\n"
-
-        # Обработка констант
-        if "const" in config:
-            for name, value in config["const"].items():
-                self.parse_constant(name, value)  # Добавление в self.constants
-                if isinstance(value, int):
-                    output += f"const {name} = {value}\n"
-                elif isinstance(value, str):
-                    output += f"const {name} = [[{value}]]\n"
-                elif isinstance(value, list):
-                    list_values = ', '.join(map(str, value))
-                    output += f"const {name} = list({list_values})\n"
-
-        # Обработка массивов
-        if "array_value" in config:
-            output += f"array_value = {config['array_value']}\n"
-
-        # Выражения
-        if "expression_addition" in config:
-            result = self.parse_expression(config["expression_addition"])
-            output += f"expression_addition = {result}\n"
-
-        if "expression_subtraction" in config:
-            result = self.parse_expression(config["expression_subtraction"])
-            output += f"expression_subtraction = {result}\n"
-
-        if "expression_multiplication" in config:
-            result = self.parse_expression(config["expression_multiplication"])
-            output += f"expression_multiplication = {result}\n"
-
-        # Конкатенация
-        if "concat_example" in config:
-            match = re.match(r'\$\{concat\s+(.+)\}', config["concat_example"])
-            if match:
-                args = match.group(1).split()
-                result = self.concat(*args)
-                output += f"concat_example = [[{result}]]\n"
-
-        # Функция ord()
-        if "ord_example" in config:
-            match = re.match(r'\$\{ord\s+(\w+)\}', config["ord_example"])
-            if match:
-                arg = match.group(1)
-                result = self.ord_func(arg)
-                output += f"ord_example = {result}\n"
-
-        return output
+        try:
+            return self.update(config)
+        except Exception:
+            # После ошибки состояние может быть несогласованным: следующий вызов переводит всё заново
+            self.reset()
+            raise
 
+    def link(self, node, old_value, new_value):
+        """Обновить обратные ссылки узла при смене его значения."""
+        for name in references(old_value):
+            self.dependents.get(name, set()).discard(node)
+        for name in references(new_value):
+            self.dependents.setdefault(name, set()).add(node)
 
+    def affected(self, changed):
+        """Изменённые узлы вместе со всеми, кто от них зависит (транзитивно)."""
+        result = set(changed)
+        stack = list(changed)
+        while stack:
+            for node in self.dependents.get(stack.pop(), ()):
+                if node not in result:
+                    result.add(node)
+                    stack.append(node)
+        return result
 
-def main():
-    input_data = json.load(sys.stdin)
-    output_path = sys.argv[1] if len(sys.argv) > 1 else "output.txt"
+    def update(self, config):
+        translator = self.translator
+        constants = translator.constants
+        previous = self.previous
+        previous_const = previous.get("const", {})
+        const = config.get("const", {})
+
+        changed = set()
+        for name in previous_const.keys() | const.keys():
+            old_value, new_value = previous_const.get(name, _MISSING), const.get(name, _MISSING)
+            if old_value == new_value and type(old_value) is type(new_value):
+                continue
+            changed.add(name)
+            self.link(name, old_value, new_value)
+            if new_value is _MISSING:
+                constants.remove(name)
+                self.const_lines.pop(name, None)
+            else:
+                translator.parse_constant(name, new_value)
+
+        for key in EXPRESSION_KEYS:
+            old_value, new_value = previous.get(key, _MISSING), config.get(key, _MISSING)
+            if old_value != new_value:
+                changed.add(key)
+                self.link(key, old_value, new_value)
+
+        affected = self.affected(changed)
+        # Сначала сбрасываются все устаревшие значения, затем строки выводятся заново
+        stale = [name for name in affected if name in const]
+        for name in stale:
+            constants.invalidate(name)
+        for name in stale:
+            self.const_lines[name] = translator.render_constant(name, const[name])
+
+        for key in SECTIONS:
+            if key == "const":
+                continue
+            if key not in config:
+                self.fragments.pop(key, None)
+            elif key in affected or key not in self.fragments or previous.get(key, _MISSING) != config[key]:
+                self.fragments[key] = ''.join(translator.render_section(key, config[key]))
 
+        self.previous = {**config, "const": dict(const)}
+
+        parts = []
+        for key in SECTIONS:
+            if key == "const":
+                if "const" in config:
+                    parts.extend(self.const_lines[name] for name in const)
+            elif key in self.fragments:
+                parts.append(self.fragments[key])
+        return ''.join(parts)
+
+
+def watch(input_path, output_path, interval=0.5):
+    """Переводить input_path заново при каждом сохранении (инкрементально)."""
+    translator = IncrementalTranslator()
+    last_mtime = None
+    while True:
+        mtime = os.stat(input_path).st_mtime_ns
+        if mtime != last_mtime:
+            last_mtime = mtime
+            try:
+                with open(input_path) as f:
+                    translated_text = translator.translate(json.load(f))
+            except ValueError as e:
+                print(f"Error: {e}")
+            else:
+                with open(output_path, 'w') as output_file:
+                    output_file.write(translated_text)
+                print(f"Configuration saved to {output_path}")
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON to configuration language translator")
+    parser.add_argument("output", nargs='?', default="output.txt", help="Output file (default: output.txt)")
+    parser.add_argument("--stream", action="store_true", help="Parse stdin incrementally and write lines as they are ready")
+    parser.add_argument("--watch", metavar="INPUT", help="Re-translate INPUT incrementally whenever it changes")
+    args = parser.parse_args()
     translator = ConfigTranslator()
+
+    if args.watch:
+        watch(args.watch, args.output)
+        return
+
+    if args.stream:
+        with open(args.output, 'w', buffering=WRITE_BUFFER) as output_file:
+            translator.translate_stream(sys.stdin, output_file)
+        print(f"Configuration saved to {args.output}")
+        return
+
+    input_data = json.load(sys.stdin)
     translated_text = translator.translate(input_data)
 
-    with open(output_path, 'w') as output_file:
+    with open(args.output, 'w') as output_file:
         output_file.write(translated_text)
-        print(f"Configuration saved to {output_path}")
+        print(f"Configuration saved to {args.output}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
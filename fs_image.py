@@ -0,0 +1,259 @@
+import argparse
+import hashlib
+import io
+import mmap
+import os
+import posixpath
+import shutil
+import struct
+import zlib
+from collections import deque
+from shell_emulator import CONTENT_CACHE_SIZE, ContentCache, FileSystem, Node, load_zip_filesystem
+
+# Образ файловой системы: заголовок, таблица узлов, хэш-таблица путей,
+# блок путей (UTF-8) и непрерывный блок содержимого файлов
+IMAGE_MAGIC = b'UFSI'
+IMAGE_VERSION = 2
+IMAGE_SUFFIX = '.fsimg'
+
+# Сигнатура, версия, число узлов, размер хэш-таблицы, смещения блоков путей и содержимого,
+# размер и время изменения исходного ZIP-файла, SHA-256 исходного ZIP-файла
+_HEADER = struct.Struct('<4sIIIQQQQ32s')
+# Родитель, первый потомок, число потомков, смещение и длина пути, начало имени в пути,
+# флаг каталога, смещение и длина содержимого
+_NODE = struct.Struct('<IIIIIIBQQ')
+_SLOT = struct.Struct('<I')  # Ячейка хэш-таблицы: inode + 1, 0 — пусто
+
+_DIR_FLAG = 1
+HASH_BLOCK = 1 << 20  # Размер блока при хэшировании исходного файла
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.digest()
+
+
+def path_hash(path_bytes):
+    return zlib.crc32(path_bytes)
+
+
+def build_image(zip_path, image_path=None):
+    """Собрать образ файловой системы из ZIP-файла; вернуть путь к образу.
+
+    Узлы нумеруются в порядке обхода в ширину, поэтому потомки каждого
+    каталога идут в таблице подряд. Образ записывается во временный файл
+    и атомарно заменяет прежний.
+    """
+    image_path = image_path or zip_path + IMAGE_SUFFIX
+    stat = os.stat(zip_path)
+    source_hash = file_hash(zip_path)
+    filesystem = load_zip_filesystem(zip_path)
+    try:
+        order = []
+        queue = deque([filesystem.root])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            if node.is_dir:
+                queue.extend(node.children.values())
+        inodes = {id(node): inode for inode, node in enumerate(order)}
+
+        # Все смещения известны заранее: размеры файлов есть в центральном каталоге ZIP
+        hash_size = 1
+        while hash_size < 2 * len(order):
+            hash_size *= 2
+        paths = bytearray()
+        records = []
+        slots = [0] * hash_size
+        content_size = 0
+        child_position = 1
+        for inode, node in enumerate(order):
+            path_bytes = node.path.encode('utf-8')
+            name_start = len(path_bytes) - len(node.name.encode('utf-8'))
+            parent = inodes[id(node.parent)] if node.parent is not None else 0
+            if node.is_dir:
+                first_child, child_count = child_position, len(node.children)
+                child_position += child_count
+                content_offset = content_length = 0
+            else:
+                first_child = child_count = 0
+                content_offset, content_length = content_size, node.source.file_size
+                content_size += content_length
+            records.append(_NODE.pack(parent, first_child, child_count, len(paths), len(path_bytes), name_start,
+                                      _DIR_FLAG if node.is_dir else 0, content_offset, content_length))
+
+            slot = path_hash(path_bytes) & (hash_size - 1)
+            while slots[slot]:
+                slot = (slot + 1) & (hash_size - 1)  # Линейное пробирование
+            slots[slot] = inode + 1
+            paths += path_bytes
+
+        paths_offset = _HEADER.size + _NODE.size * len(order) + _SLOT.size * hash_size
+        content_offset = paths_offset + len(paths)
+        header = _HEADER.pack(IMAGE_MAGIC, IMAGE_VERSION, len(order), hash_size, paths_offset, content_offset,
+                              stat.st_size, stat.st_mtime_ns, source_hash)
+
+        tmp_path = f"{image_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(b''.join(records))
+            f.write(struct.pack(f'<{hash_size}I', *slots))
+            f.write(paths)
+            for node in order:
+                if not node.is_dir:
+                    with filesystem.open_source(node) as src:
+                        shutil.copyfileobj(src, f)
+        os.replace(tmp_path, image_path)
+    finally:
+        filesystem.close()
+    return image_path
+
+
+def read_header(image_path):
+    """Заголовок образа или None, если файла нет или он не является образом текущей версии."""
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    header = _HEADER.unpack(data)
+    if header[0] != IMAGE_MAGIC or header[1] != IMAGE_VERSION:
+        return None
+    return header
+
+
+def open_image(zip_path, image_path=None, cache_size=CONTENT_CACHE_SIZE):
+    """Открыть образ файловой системы ZIP-файла, при необходимости собрав его заново.
+
+    Образ считается актуальным, если совпадают размер и время изменения ZIP-файла.
+    Если изменилось только время, а SHA-256 совпадает, в заголовке обновляется время.
+    """
+    image_path = image_path or zip_path + IMAGE_SUFFIX
+    stat = os.stat(zip_path)
+    header = read_header(image_path)
+    if header is None or header[6] != stat.st_size:
+        build_image(zip_path, image_path)
+    elif header[7] != stat.st_mtime_ns:
+        if file_hash(zip_path) == header[8]:
+            with open(image_path, 'r+b') as f:
+                f.write(_HEADER.pack(*header[:7], stat.st_mtime_ns, header[8]))
+        else:
+            build_image(zip_path, image_path)
+    return ImageFileSystem(image_path, cache_size)
+
+
+class _BlobReader(io.RawIOBase):
+    """Поток для чтения участка отображённого в память образа без копирования всего участка."""
+
+    def __init__(self, view):
+        self.view = view
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self.view) - self.pos)
+        buffer[:size] = self.view[self.pos:self.pos + size]
+        self.pos += size
+        return size
+
+    def close(self):
+        self.view.release()
+        super().close()
+
+
+class ImageFileSystem(FileSystem):
+    """Файловая система из образа, отображённого в память (mmap).
+
+    При открытии читается только заголовок; узлы создаются при первом
+    обращении, поиск пути идёт по хэш-таблице образа. Каталог, полученный
+    через lookup() или node(), содержит всех своих потомков.
+    """
+
+    def __init__(self, image_path, cache_size=CONTENT_CACHE_SIZE):
+        self.cache = ContentCache(cache_size)
+        with open(image_path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        header = _HEADER.unpack_from(self.mm, 0)
+        if header[0] != IMAGE_MAGIC or header[1] != IMAGE_VERSION:
+            raise ValueError(f"Not a filesystem image: {image_path}")
+        self.node_count, self.hash_size, self.paths_offset, self.content_offset = header[2:6]
+        self.slots_offset = _HEADER.size + _NODE.size * self.node_count
+        self.loaded = {}  # inode -> созданный узел
+        self.filled = set()  # Каталоги, потомки которых уже созданы
+        self.root = self.node(0)
+
+    def record(self, inode):
+        return _NODE.unpack_from(self.mm, _HEADER.size + _NODE.size * inode)
+
+    def make_node(self, inode, parent):
+        _, _, _, path_offset, path_length, name_start, flags, content_offset, content_length = self.record(inode)
+        start = self.paths_offset + path_offset
+        path = self.mm[start:start + path_length].decode('utf-8')
+        # Начало имени хранится как смещение в байтах UTF-8, а не в символах
+        name = self.mm[start + name_start:start + path_length].decode('utf-8')
+        is_dir = bool(flags & _DIR_FLAG)
+        node = Node(inode, name, path, parent, is_dir, owner=None if is_dir else 'default_owner')
+        if not is_dir:
+            node.source = (self.content_offset + content_offset, content_length)
+        self.loaded[inode] = node
+        return node
+
+    def node(self, inode):
+        """Узел по номеру; у каталога создаются все непосредственные потомки."""
+        node = self.loaded.get(inode)
+        if node is None:
+            if inode == 0:
+                node = self.make_node(0, None)
+            else:
+                self.node(self.record(inode)[0])  # Родитель создаёт узел вместе с остальными потомками
+                node = self.loaded[inode]
+        if node.is_dir and inode not in self.filled:
+            self.filled.add(inode)
+            _, first_child, child_count = self.record(inode)[:3]
+            for child in range(first_child, first_child + child_count):
+                child_node = self.loaded.get(child) or self.make_node(child, node)
+                node.children[child_node.name] = child_node
+        return node
+
+    def lookup(self, path):
+        """Узел по пути через хэш-таблицу образа или None."""
+        path_bytes = posixpath.normpath(path).replace('//', '/').encode('utf-8')
+        mask = self.hash_size - 1
+        slot = path_hash(path_bytes) & mask
+        while True:
+            (entry,) = _SLOT.unpack_from(self.mm, self.slots_offset + _SLOT.size * slot)
+            if not entry:
+                return None
+            path_offset, path_length = self.record(entry - 1)[3:5]
+            start = self.paths_offset + path_offset
+            if path_length == len(path_bytes) and self.mm[start:start + path_length] == path_bytes:
+                return self.node(entry - 1)
+            slot = (slot + 1) & mask
+
+    def read_source(self, node):
+        offset, length = node.source
+        return self.mm[offset:offset + length]
+
+    def open_source(self, node):
+        offset, length = node.source
+        return io.BufferedReader(_BlobReader(self.view[offset:offset + length]))
+
+    def close(self):
+        self.view.release()
+        self.mm.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a precompiled filesystem image from a ZIP archive")
+    parser.add_argument("zip_path", help="Filesystem archive (e.g., Fs.zip)")
+    parser.add_argument("image_path", nargs='?', help=f"Output image (default: <zip_path>{IMAGE_SUFFIX})")
+    args = parser.parse_args()
+    print(f"Image saved to {build_image(args.zip_path, args.image_path)}")
@@ -1,111 +1,729 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
 import struct
 import sys
-import yaml
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from contextlib import closing
+from log_formats import LOG_FORMATS, write_result
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: по умолчанию память хранится в array('Q')
+    np = None
+
+
+# Коды операций УВМ
+LOAD_CONST = 36
+READ_MEM = 55
+WRITE_MEM = 84
+BITREVERSE = 186
+
+OPCODE_NAMES = {
+    LOAD_CONST: 'LOAD_CONST',
+    READ_MEM: 'READ_MEM',
+    WRITE_MEM: 'WRITE_MEM',
+    BITREVERSE: 'BITREVERSE',
+}
+
+INSTRUCTION_SIZE = 5  # Каждая команда занимает 5 байтов
+DECODE_CHUNK = 1 << 16  # Количество команд в одном блоке при потоковом выполнении
+JIT_BLOCK = 1024  # Количество команд в одной сгенерированной функции
+JIT_CACHE_SIZE = 64  # Количество скомпилированных программ, хранимых в кэше
+
+# Байт кода операции + 4 байта полей B и C
+_INSTRUCTION = struct.Struct('<BI')
+
+MEMORY_TYPECODE = 'Q'  # Ячейка памяти — 64-битное беззнаковое целое
+MEMORY_BACKENDS = ('array', 'numpy', 'paged')
+
+PAGE_SHIFT = 9  # Страница памяти — 512 ячеек (4 КиБ)
+PAGE_SIZE = 1 << PAGE_SHIFT
+PAGE_MASK = PAGE_SIZE - 1
+
+# Снимок состояния: сигнатура, версия, счётчик команд, размер памяти, сжатая память
+SNAPSHOT_MAGIC = b'UVMS'
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct('<4sBQQ')
+
+# Таблицы реверса битов для 8- и 16-битных значений
+REVERSE8 = bytes(int('{:08b}'.format(i)[::-1], 2) for i in range(256))
+REVERSE16 = array('H', [(REVERSE8[i & 0xFF] << 8) | REVERSE8[i >> 8] for i in range(1 << 16)])
+
+BATCH_MIN_RUN = 4  # Минимальная длина серии команд для пакетного выполнения
+
+
+def reverse_bits(value):
+    """Реверс битов в наименьшем подходящем слове: 8, 16, 32 или 64 бита."""
+    if value < 0x100:
+        return REVERSE8[value]
+    if value < 0x10000:
+        return REVERSE16[value]
+    if value < 0x100000000:
+        return (REVERSE16[value & 0xFFFF] << 16) | REVERSE16[value >> 16]
+    low = (REVERSE16[value & 0xFFFF] << 16) | REVERSE16[(value >> 16) & 0xFFFF]
+    high = (REVERSE16[(value >> 32) & 0xFFFF] << 16) | REVERSE16[value >> 48]
+    return (low << 32) | high
+
+
+def reverse_bits_vector(values):
+    """Векторный вариант reverse_bits для массива NumPy uint64."""
+    values = values.astype(np.uint64)
+    table = np.frombuffer(REVERSE8, dtype=np.uint8).astype(np.uint64)
+    reversed64 = np.zeros_like(values)
+    for k in range(8):
+        byte = (values >> np.uint64(8 * k)) & np.uint64(0xFF)
+        reversed64 |= table[byte.astype(np.intp)] << np.uint64(56 - 8 * k)
+    width = np.select([values < 0x100, values < 0x10000, values < 0x100000000], [8, 16, 32], 64)
+    return reversed64 >> (np.uint64(64) - width.astype(np.uint64))
+
+
+class Program:
+    """Декодированная программа: параллельные массивы кодов операций, операндов и смещений."""
+
+    def __init__(self):
+        self.opcodes = array('B')
+        self.operands_b = array('H')
+        self.operands_c = array('H')
+        self.offsets = array('Q')  # Позиция команды в исходном бинарном файле
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def append(self, a, b, c, offset):
+        self.opcodes.append(a)
+        self.operands_b.append(b)
+        self.operands_c.append(c)
+        self.offsets.append(offset)
+
+    def digest(self):
+        """Хэш содержимого программы (без учёта смещений)."""
+        h = hashlib.sha256()
+        h.update(self.opcodes.tobytes())
+        h.update(self.operands_b.tobytes())
+        h.update(self.operands_c.tobytes())
+        return h.hexdigest()
+
+
+def decode(binary_data):
+    """Однократно декодировать бинарный файл в таблицу команд."""
+    program = Program()
+    with memoryview(binary_data) as view:
+        _decode_into(program, view, 0, len(view))
+    return program
+
+
+def iter_decode(binary_data, chunk_size=DECODE_CHUNK):
+    """Декодировать программу блоками не более чем по chunk_size команд.
+
+    binary_data может быть mmap: байты читаются напрямую, без копирования файла.
+    """
+    with memoryview(binary_data) as view:
+        i = 0
+        while i < len(view):
+            program = Program()
+            i = _decode_into(program, view, i, min(len(view), i + chunk_size * INSTRUCTION_SIZE))
+            yield program
+
+
+def _decode_into(program, view, i, end):
+    """Декодировать команды, начинающиеся до позиции end; вернуть позицию следующей."""
+    size = len(view)
+
+    # Быстрый путь: блок состоит только из корректных 5-байтовых команд
+    if (end - i) % INSTRUCTION_SIZE == 0 and set(view[i:end:INSTRUCTION_SIZE]) <= OPCODE_NAMES.keys():
+        offset = i
+        for a, fields in _INSTRUCTION.iter_unpack(view[i:end]):
+            if a == LOAD_CONST:
+                # B — 13 бит, C — 11 бит, попадающих в первые 4 байта команды
+                program.append(a, fields & 0x1FFF, (fields >> 13) & 0x7FF, offset)
+            else:
+                # B и C — по 12 бит в байтах 1-3
+                program.append(a, fields & 0xFFF, (fields >> 12) & 0xFFF, offset)
+            offset += INSTRUCTION_SIZE
+        return end
+
+    # Общий путь: побайтовое сканирование с пропуском неизвестных байтов
+    while i < end:
+        a = view[i]
+        if a == LOAD_CONST and i + 4 <= size:
+            raw_data = int.from_bytes(view[i:i + 4], byteorder='little')
+            program.append(a, (raw_data >> 8) & 0x1FFF, (raw_data >> 21) & 0xFFF, i)
+            i += INSTRUCTION_SIZE
+        elif a in (READ_MEM, WRITE_MEM, BITREVERSE):
+            combined = int.from_bytes(view[i + 1:i + 4], byteorder='little')
+            program.append(a, combined & 0xFFF, (combined >> 12) & 0xFFF, i)
+            i += INSTRUCTION_SIZE
+        else:
+            i += 1
+    return i
+
+
+class Batch:
+    """Серия независимых команд копирования/реверса: memory[dsts] = f(memory[srcs])."""
+
+    def __init__(self):
+        self.srcs = array('H')
+        self.dsts = array('H')
+        self.reverse = array('B')  # 1 — BITREVERSE, 0 — простое копирование
+
+
+def plan_batches(program, memory_size):
+    """Разбить программу на пакеты независимых команд и одиночные команды.
+
+    Возвращает список элементов: Batch либо (start, end) — диапазон команд
+    для обычного пошагового выполнения.
+    """
+    plan = []
+    scalar_start = 0
+    batch, written, start = Batch(), set(), 0
+
+    def flush(end):
+        nonlocal scalar_start, batch, written
+        if len(batch.dsts) >= BATCH_MIN_RUN:
+            if scalar_start < start:
+                plan.append((scalar_start, start))
+            plan.append(batch)
+            scalar_start = end
+        batch, written = Batch(), set()
+
+    for i, (a, b, c) in enumerate(zip(program.opcodes, program.operands_b, program.operands_c)):
+        if a == WRITE_MEM:
+            src, dst = c, b
+        elif a in (READ_MEM, BITREVERSE):
+            src, dst = b, c
+        else:
+            src = dst = None
+
+        # Серия прерывается на LOAD_CONST, выходе за границы памяти и зависимостях по данным
+        if src is None or src >= memory_size or dst >= memory_size:
+            flush(i)
+            start = i + 1
+            continue
+        if src in written or dst in written:
+            flush(i)
+            start = i
+
+        batch.srcs.append(src)
+        batch.dsts.append(dst)
+        batch.reverse.append(a == BITREVERSE)
+        written.add(dst)
+
+    flush(len(program))
+    if scalar_start < len(program):
+        plan.append((scalar_start, len(program)))
+    return plan
+
+
+# LRU-кэш скомпилированных программ: (хэш программы, размер памяти) -> функция
+_compiled_programs = OrderedDict()
+
+
+def generate_source(program, memory_size):
+    """Сгенерировать исходный код Python-функции, выполняющей программу.
+
+    Команды разбиваются на функции-блоки по JIT_BLOCK строк: компиляция и поиск
+    номера строки (трассировки, tracemalloc) для очень длинных функций
+    растут быстрее линейного.
+    """
+    lines = []
+    blocks = 0
+    for i, (a, b, c) in enumerate(zip(program.opcodes, program.operands_b, program.operands_c)):
+        if i % JIT_BLOCK == 0:
+            lines.append(f"def block_{blocks}(m, rev):")
+            blocks += 1
+        if a == LOAD_CONST and c < memory_size:
+            lines.append(f"    m[{c}] = {b}")
+        elif c >= memory_size or a != LOAD_CONST and b >= memory_size:
+            lines.append(f"    print('Error: Address out of bounds for {OPCODE_NAMES[a]}: B={b}, C={c}')")
+        elif a == READ_MEM:
+            lines.append(f"    m[{c}] = m[{b}]")
+        elif a == WRITE_MEM:
+            lines.append(f"    m[{b}] = m[{c}]")
+        elif a == BITREVERSE:
+            lines.append(f"    m[{c}] = rev(m[{b}])")
+
+    lines.append("def run(m, rev):")
+    lines.extend(f"    block_{i}(m, rev)" for i in range(blocks))
+    lines.append("    return None")
+    return '\n'.join(lines) + '\n'
+
+
+def compile_program(program, memory_size):
+    """Скомпилировать программу в Python-функцию run(memory) с кэшированием по хэшу."""
+    key = (program.digest(), memory_size)
+    run = _compiled_programs.get(key)
+    if run is not None:
+        _compiled_programs.move_to_end(key)
+    else:
+        namespace = {}
+        exec(compile(generate_source(program, memory_size), f"<uvm {key[0][:12]}>", 'exec'), namespace)
+        compiled = namespace['run']
+
+        def run(memory):
+            if isinstance(memory, array):
+                return compiled(memory, reverse_bits)
+            return compiled(memory, lambda value: reverse_bits(int(value)))
+
+        _compiled_programs[key] = run
+        if len(_compiled_programs) > JIT_CACHE_SIZE:
+            _compiled_programs.popitem(last=False)
+    return run
+
+
+class Profiler:
+    """Счётчики производительности: команды по кодам операций, время и обращения к памяти."""
+
+    def __init__(self, memory_size):
+        self.counts = dict.fromkeys(OPCODE_NAMES, 0)
+        self.seconds = dict.fromkeys(OPCODE_NAMES, 0.0)
+        self.reads = array('Q', bytes(memory_size * 8))
+        self.writes = array('Q', bytes(memory_size * 8))
+        self.decoded_bytes = 0
+        self.decode_seconds = 0.0
+        self.execute_seconds = 0.0
+
+    def record_decode(self, size, seconds):
+        self.decoded_bytes += size
+        self.decode_seconds += seconds
+
+    def record_access(self, a, b, c):
+        """Учесть чтения и записи памяти, выполненные командой."""
+        size = len(self.reads)
+        if a == LOAD_CONST:
+            if c < size:
+                self.writes[c] += 1
+        elif b < size and c < size:
+            if a == WRITE_MEM:
+                self.reads[c] += 1
+                self.writes[b] += 1
+            else:
+                self.reads[b] += 1
+                self.writes[c] += 1
+
+    def report(self, top=32):
+        """Отчёт в виде словаря, пригодного для сериализации в JSON."""
+        instructions = sum(self.counts.values())
+
+        def rate(amount, seconds):
+            return amount / seconds if seconds > 0 else None
+
+        def heatmap(counters):
+            return {str(address): count for address, count in enumerate(counters) if count}
+
+        def hottest(counters):
+            ranked = sorted((item for item in enumerate(counters) if item[1]), key=lambda item: -item[1])
+            return [{'address': address, 'count': count} for address, count in ranked[:top]]
+
+        return {
+            'instructions': instructions,
+            'decode': {
+                'bytes': self.decoded_bytes,
+                'seconds': self.decode_seconds,
+                'bytes_per_second': rate(self.decoded_bytes, self.decode_seconds),
+            },
+            'execute': {
+                'seconds': self.execute_seconds,
+                'instructions_per_second': rate(instructions, self.execute_seconds),
+            },
+            'opcodes': {
+                OPCODE_NAMES[a]: {'count': self.counts[a], 'seconds': self.seconds[a]} for a in OPCODE_NAMES
+            },
+            'hot_reads': hottest(self.reads),
+            'hot_writes': hottest(self.writes),
+            'read_heatmap': heatmap(self.reads),
+            'write_heatmap': heatmap(self.writes),
+        }
+
+    def write_report(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def profile_path(output_file):
+    """Путь к отчёту профилировщика рядом с файлом результата."""
+    return os.path.splitext(output_file)[0] + '.profile.json'
+
+
+class PagedMemory:
+    """Память из страниц array('Q'), разделяемых между форками до первой записи.
+
+    fork() копирует только список страниц; страница копируется той стороной,
+    которая первой в неё пишет (copy-on-write).
+    """
+
+    def __init__(self, pages, size):
+        self.pages = pages
+        self.size = size
+        self.owned = bytearray([1]) * len(pages)  # 1 — страница принадлежит только этой памяти
+
+    @classmethod
+    def from_buffer(cls, memory):
+        """Разбить массив (array, NumPy или байты uint64) на страницы."""
+        values = array(MEMORY_TYPECODE, memory.tobytes() if hasattr(memory, 'tobytes') else memory)
+        pages = [values[i:i + PAGE_SIZE] for i in range(0, len(values), PAGE_SIZE)]
+        return cls(pages, len(values))
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, address):
+        if isinstance(address, slice):
+            start, end, step = address.indices(self.size)
+            return self.read_range(start, end)
+        return self.pages[address >> PAGE_SHIFT][address & PAGE_MASK]
+
+    def __setitem__(self, address, value):
+        if isinstance(address, slice):
+            start, end, step = address.indices(self.size)
+            values = array(MEMORY_TYPECODE, value)
+            if len(values) != end - start:
+                raise ValueError("PagedMemory does not support resizing slice assignment")
+            for i, item in enumerate(values):
+                self[start + i] = item
+            return
+        index = address >> PAGE_SHIFT
+        if not self.owned[index]:
+            self.pages[index] = array(MEMORY_TYPECODE, self.pages[index])
+            self.owned[index] = 1
+        self.pages[index][address & PAGE_MASK] = value
+
+    def read_range(self, start, end):
+        result = array(MEMORY_TYPECODE)
+        while start < end:
+            page = self.pages[start >> PAGE_SHIFT]
+            offset = start & PAGE_MASK
+            chunk = min(end - start, len(page) - offset)
+            result.extend(page[offset:offset + chunk])
+            start += chunk
+        return result
+
+    def fork(self):
+        """Дочерняя память, разделяющая с этой все страницы."""
+        child = PagedMemory(list(self.pages), self.size)
+        child.owned = bytearray(len(self.pages))
+        self.owned = bytearray(len(self.pages))
+        return child
+
+    def clear(self):
+        self.pages = PagedMemory.from_buffer(allocate_memory(self.size)).pages
+        self.owned = bytearray([1]) * len(self.pages)
+
+    def tobytes(self):
+        return b''.join(page.tobytes() for page in self.pages)
+
+
+def allocate_memory(memory_size, backend='array'):
+    """Выделить обнулённую типизированную память УВМ."""
+    if backend == 'array':
+        return array(MEMORY_TYPECODE, bytes(memory_size * array(MEMORY_TYPECODE).itemsize))
+    if backend == 'paged':
+        return PagedMemory.from_buffer(allocate_memory(memory_size))
+    if backend == 'numpy':
+        if np is None:
+            raise ValueError("Memory backend 'numpy' requires NumPy to be installed")
+        return np.zeros(memory_size, dtype=np.uint64)
+    raise ValueError(f"Unsupported memory backend: {backend}")
 
 
 class Interpreter:
-    def __init__(self, memory_size=1024):
-        self.memory = [0] * memory_size
+    def __init__(self, memory_size=1024, trace=False, memory_backend='array', batch=False, jit=False,
+                 profile=False):
+        self.memory = allocate_memory(memory_size, memory_backend)
+        self.trace = trace  # Подробный пошаговый вывод (старый режим)
+        self.batch = batch  # Пакетное выполнение серий независимых команд
+        self.jit = jit  # Компиляция программы в Python-функцию
+        self.profiler = Profiler(memory_size) if profile else None  # Сбор счётчиков производительности
+        self.pc = 0  # Номер следующей команды для run() и снимков состояния
+        self.handlers = {
+            LOAD_CONST: self.load_constant,
+            READ_MEM: self.read_mem,
+            WRITE_MEM: self.write_mem,
+            BITREVERSE: self.bitreverse,
+        }
 
     def load_constant(self, b, c):
-        self.memory[c] = b
-        print(f"LOAD_CONST executed: memory[{c}] = {b}")
+        if c < len(self.memory):
+            self.memory[c] = b
+            if self.trace:
+                print(f"LOAD_CONST executed: memory[{c}] = {b}")
+        else:
+            print(f"Error: Address out of bounds for LOAD_CONST: B={b}, C={c}")
 
     def read_mem(self, b, c):
         if b < len(self.memory) and c < len(self.memory):
             self.memory[c] = self.memory[b]
-            print(f"READ_MEM executed: memory[{c}] = memory[{b}] = {self.memory[b]}")
+            if self.trace:
+                print(f"READ_MEM executed: memory[{c}] = memory[{b}] = {self.memory[b]}")
         else:
             print(f"Error: Address out of bounds for READ_MEM: B={b}, C={c}")
 
     def write_mem(self, b, c):
         if b < len(self.memory) and c < len(self.memory):
             self.memory[b] = self.memory[c]
-            print(f"WRITE_MEM executed: memory[{b}] = memory[{c}] = {self.memory[b]}")
+            if self.trace:
+                print(f"WRITE_MEM executed: memory[{b}] = memory[{c}] = {self.memory[b]}")
         else:
             print(f"Error: Address out of bounds for WRITE_MEM: B={b}, C={c}")
 
     def bitreverse(self, b, c):
         if b < len(self.memory) and c < len(self.memory):
-            self.memory[c] = int('{:08b}'.format(self.memory[b])[::-1], 2)
-            print(f"BITREVERSE executed: memory[{c}] = {self.memory[c]}")
+            self.memory[c] = reverse_bits(int(self.memory[b]))
+            if self.trace:
+                print(f"BITREVERSE executed: memory[{c}] = {self.memory[c]}")
         else:
             print(f"Error: Address out of bounds for BITREVERSE: B={b}, C={c}")
 
-    def interpret(self, input_file, output_file, memory_range):
-        if memory_range[1] > len(self.memory):
-            print(f"Error: Memory range {memory_range} is out of bounds.")
-            return
+    def reset(self):
+        """Обнулить память перед выполнением следующей программы."""
+        if isinstance(self.memory, array):
+            self.memory[:] = allocate_memory(len(self.memory))
+        elif isinstance(self.memory, PagedMemory):
+            self.memory.clear()
+        else:
+            self.memory.fill(0)
+        self.pc = 0
 
-        try:
-            with open(input_file, 'rb') as f:
-                binary_data = f.read()
-        except FileNotFoundError:
-            print(f"Error: Input file '{input_file}' not found.")
-            return
+    def load_constants(self, start, values):
+        """Массово записать значения в память, начиная с адреса start."""
+        end = start + len(values)
+        if start < 0 or end > len(self.memory):
+            raise ValueError(f"Memory range ({start}, {end}) is out of bounds")
+        if isinstance(self.memory, (array, PagedMemory)):
+            values = array(MEMORY_TYPECODE, values)
+        self.memory[start:end] = values
 
-        i = 0
-        while i < len(binary_data):
-            a = binary_data[i]
-            print(f"Reading byte: A={a}, Position={i}")
-
-            if a == 36:  # LOAD_CONST (4 байта)
-               if i + 4 <= len(binary_data):  # Проверка, достаточно ли данных
-        # Получаем все 4 байта команды
-                  raw_data = int.from_bytes(binary_data[i:i + 4], byteorder='little')
-
-        
-        # A: первый байт (самый младший байт)
-                  a = raw_data & 0xFF
-        # B: биты с 8 по 19
-                  b = (raw_data >> 8) & 0x1FFF  # Маска 12 бит
-        # C: биты с 20 по 31
-                  c = (raw_data >> 21) & 0xFFF  # Маска 12 бит
-
-                  print(f"Command LOAD_CONST found: A={a}, B={b}, C={c}")
-                  self.load_constant(b, c)
-                  i += 4
-
-
-            if a in {55, 84, 186}:  # READ_MEM, WRITE_MEM, BITREVERSE (5 байт)
-                # Считываем 12 бит для B и 12 бит для C
-                combined = int.from_bytes(binary_data[i + 1:i + 4], byteorder='little')
-                b = combined & 0xFFF  # Первые 12 бит
-                c = (combined >> 12) & 0xFFF  # Следующие 12 бит
-                print(f"Command {['READ_MEM', 'WRITE_MEM', 'BITREVERSE'][[55, 84, 186].index(a)]} found: B={b}, C={c}")
-
-                if a == 55:
-                    self.read_mem(b, c)
-                elif a == 84:
-                    self.write_mem(b, c)
-                elif a == 186:
-                    self.bitreverse(b, c)
-
-                i += 5
+    def copy_memory(self, src, dst, length):
+        """Скопировать length ячеек из src в dst (перекрывающиеся диапазоны допустимы)."""
+        if min(src, dst) < 0 or max(src, dst) + length > len(self.memory):
+            raise ValueError(f"Memory copy {src} -> {dst} of {length} cells is out of bounds")
+        self.memory[dst:dst + length] = self.memory[src:src + length]
+
+    def memory_view(self, start, end):
+        """Представление диапазона памяти без копирования (для страничной памяти — копия диапазона)."""
+        if isinstance(self.memory, PagedMemory):
+            return memoryview(self.memory.read_range(start, end))
+        return memoryview(self.memory)[start:end]
+
+    def snapshot_range(self, start, end):
+        """Значения диапазона памяти в виде списка (стоимость зависит только от диапазона)."""
+        return self.memory[start:end].tolist()
 
+    def run(self, program, steps=None):
+        """Выполнить steps команд программы, начиная с self.pc (по умолчанию — до конца)."""
+        end = len(program) if steps is None else min(len(program), self.pc + steps)
+        self.execute_range(program, self.pc, end)
+        self.pc = end
+
+    def snapshot(self):
+        """Компактный двоичный снимок: счётчик команд и сжатая память."""
+        data = array(MEMORY_TYPECODE, self.memory.tobytes())
+        if sys.byteorder != 'little':
+            data.byteswap()
+        header = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.pc, len(self.memory))
+        return header + zlib.compress(data, 1)
+
+    def restore(self, snapshot):
+        """Загрузить состояние из снимка, сохранив тип памяти интерпретатора."""
+        magic, version, pc, memory_size = _SNAPSHOT_HEADER.unpack_from(snapshot)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Not an interpreter snapshot or unsupported snapshot version")
+        values = array(MEMORY_TYPECODE, zlib.decompress(memoryview(snapshot)[_SNAPSHOT_HEADER.size:]))
+        if sys.byteorder != 'little':
+            values.byteswap()
+        if len(values) != memory_size:
+            raise ValueError("Corrupted interpreter snapshot")
+
+        if isinstance(self.memory, PagedMemory):
+            self.memory = PagedMemory.from_buffer(values)
+        elif np is not None and isinstance(self.memory, np.ndarray):
+            self.memory = np.frombuffer(values, dtype=np.uint64).copy()
+        else:
+            self.memory = values
+        self.pc = pc
+
+    def fork(self):
+        """Копия интерпретатора, разделяющая страницы памяти до первой записи."""
+        if not isinstance(self.memory, PagedMemory):
+            self.memory = PagedMemory.from_buffer(self.memory)
+        child = Interpreter(memory_size=0, trace=self.trace, batch=self.batch, jit=self.jit)
+        child.memory = self.memory.fork()
+        child.pc = self.pc
+        return child
+
+    def execute(self, program):
+        """Выполнить декодированную программу через таблицу обработчиков."""
+        if self.trace:
+            return self.execute_traced(program)
+        if self.profiler is not None:
+            return self.execute_profiled(program)
+        if self.jit:
+            return compile_program(program, len(self.memory))(self.memory)
+        if self.batch and self.vectorized():
+            return self.execute_batched(program)
+
+        self.execute_range(program, 0, len(program))
+
+    def execute_range(self, program, start, end):
+        handlers = self.handlers
+        for a, b, c in zip(program.opcodes[start:end], program.operands_b[start:end], program.operands_c[start:end]):
+            handlers[a](b, c)
+
+    def vectorized(self):
+        """Можно ли выполнять пакеты векторно (только над памятью NumPy).
+
+        Для array('Q') и страничной памяти построение пакетов медленнее пошагового выполнения.
+        """
+        return np is not None and isinstance(self.memory, np.ndarray)
+
+    def execute_batched(self, program):
+        """Выполнить программу, объединяя независимые команды в векторные операции."""
+        for step in plan_batches(program, len(self.memory)):
+            if isinstance(step, Batch):
+                self.execute_batch(step)
+            else:
+                self.execute_range(program, *step)
+
+    def execute_batch(self, batch):
+        """Выполнить пакет над памятью NumPy: все источники читаются до первой записи."""
+        memory = self.memory
+        srcs = np.frombuffer(batch.srcs, dtype=np.uint16).astype(np.intp)
+        dsts = np.frombuffer(batch.dsts, dtype=np.uint16).astype(np.intp)
+        mask = np.frombuffer(batch.reverse, dtype=np.uint8).astype(bool)
+        values = memory[srcs]
+        values[mask] = reverse_bits_vector(values[mask])
+        memory[dsts] = values
+
+    def execute_profiled(self, program):
+        """Пошаговое выполнение с замером времени и подсчётом обращений к памяти."""
+        profiler = self.profiler
+        handlers = self.handlers
+        clock = time.perf_counter
+        started = clock()
+        for a, b, c in zip(program.opcodes, program.operands_b, program.operands_c):
+            start = clock()
+            handlers[a](b, c)
+            profiler.seconds[a] += clock() - start
+            profiler.counts[a] += 1
+            profiler.record_access(a, b, c)
+        profiler.execute_seconds += clock() - started
+
+    def execute_traced(self, program):
+        for a, b, c, offset in zip(program.opcodes, program.operands_b, program.operands_c, program.offsets):
+            print(f"Reading byte: A={a}, Position={offset}")
+            if a == LOAD_CONST:
+                print(f"Command LOAD_CONST found: A={a}, B={b}, C={c}")
             else:
-                i += 1
+                print(f"Command {OPCODE_NAMES[a]} found: B={b}, C={c}")
+            self.handlers[a](b, c)
+
+    def execute_file(self, input_file, chunk_size=DECODE_CHUNK):
+        """Выполнить программу непосредственно из отображения файла в память."""
+        with open(input_file, 'rb') as f:
+            if f.seek(0, 2) == 0:  # Пустой файл нельзя отобразить в память
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as binary_data, \
+                    closing(iter_decode(binary_data, chunk_size)) as programs:
+                decode_seconds = 0.0
+                while True:
+                    start = time.perf_counter()
+                    program = next(programs, None)
+                    decode_seconds += time.perf_counter() - start
+                    if program is None:
+                        break
+                    self.execute(program)
+                if self.profiler is not None:
+                    self.profiler.record_decode(len(binary_data), decode_seconds)
 
-        result = {'memory_range': memory_range, 'values': self.memory[memory_range[0]:memory_range[1]]}
+    def check_memory_range(self, memory_range):
+        if memory_range[0] < 0 or memory_range[1] > len(self.memory):
+            raise ValueError(f"Memory range {memory_range} is out of bounds")
+
+    def execute_path(self, input_file, stream=False):
+        """Загрузить и выполнить программу из файла."""
+        if stream:
+            self.execute_file(input_file)
+            return
+        with open(input_file, 'rb') as f:
+            binary_data = f.read()
+        start = time.perf_counter()
+        program = decode(binary_data)
+        if self.profiler is not None:
+            self.profiler.record_decode(len(binary_data), time.perf_counter() - start)
+        self.execute(program)
+
+    def write_output(self, output_file, memory_range, result_format='yaml'):
+        """Записать диапазон памяти в файл результата (и отчёт профилировщика, если он включён)."""
+        # Двоичный формат пишется прямо из представления памяти, без копирования
+        if result_format == 'binary':
+            values = self.memory_view(*memory_range)
+        else:
+            values = self.snapshot_range(*memory_range)
+        write_result(output_file, memory_range, values, result_format)
+        if self.profiler is not None:
+            self.profiler.write_report(profile_path(output_file))
+
+    def run_file(self, input_file, output_file, memory_range, stream=False, result_format='yaml'):
+        """Выполнить программу из файла и записать результат; ошибки передаются вызывающему."""
+        self.check_memory_range(memory_range)
+        self.execute_path(input_file, stream)
+        self.write_output(output_file, memory_range, result_format)
+
+    def interpret(self, input_file, output_file, memory_range, stream=False, result_format='yaml'):
+        """Выполнить программу, сообщая об ошибках в консоль; вернуть True, если результат записан."""
+        try:
+            self.check_memory_range(memory_range)
+        except ValueError:
+            print(f"Error: Memory range {memory_range} is out of bounds.")
+            return False
 
         try:
-            with open(output_file, 'w') as f:
-                yaml.dump(result, f)
-            print(f"Result successfully written to {output_file}")
+            self.execute_path(input_file, stream)
+        except FileNotFoundError:
+            print(f"Error: Input file '{input_file}' not found.")
+            return False
+
+        try:
+            self.write_output(output_file, memory_range, result_format)
         except Exception as e:
             print(f"Error writing to output file '{output_file}': {e}")
+            return False
+
+        print(f"Result successfully written to {output_file}")
+        if self.profiler is not None:
+            print(f"Profile written to {profile_path(output_file)}")
+        return True
 
 
 # Запуск интерпретатора с аргументами командной строки
 if __name__ == "__main__":
-    if len(sys.argv) != 5:
-        print("Usage: python3 interpreter.py <input_file> <output_file> <memory_start> <memory_end>")
-    else:
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
-        memory_start = int(sys.argv[3])
-        memory_end = int(sys.argv[4])
-        memory_range = (memory_start, memory_end)
-
-        interpreter = Interpreter()
-        interpreter.interpret(input_file, output_file, memory_range)
+    parser = argparse.ArgumentParser(description="УВМ interpreter")
+    parser.add_argument("input_file", help="Path to the binary program (e.g., program.bin)")
+    parser.add_argument("output_file", help="Path to the result file (e.g., result.yaml)")
+    parser.add_argument("memory_start", type=int, help="First address of the memory range to save")
+    parser.add_argument("memory_end", type=int, help="End address (exclusive) of the memory range to save")
+    parser.add_argument("--trace", action="store_true", help="Print every decoded and executed command")
+    parser.add_argument("--memory-size", type=int, default=1024, help="Number of memory cells (default: 1024)")
+    parser.add_argument("--memory-backend", choices=MEMORY_BACKENDS, default='array',
+                        help="Memory storage: array('Q') or NumPy uint64 buffer (default: array)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Execute runs of independent READ_MEM/WRITE_MEM/BITREVERSE commands as vectorized "
+                             "batches (with --memory-backend numpy; other backends run step by step)")
+    parser.add_argument("--jit", action="store_true", help="Compile the program into a Python function before running")
+    parser.add_argument("--stream", action="store_true",
+                        help="Execute the program block by block from a memory-mapped file")
+    parser.add_argument("--result-format", choices=LOG_FORMATS, default='yaml',
+                        help="Result file format (default: yaml)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Collect per-opcode counters and write <output>.profile.json")
+    args = parser.parse_args()
+
+    interpreter = Interpreter(memory_size=args.memory_size, trace=args.trace, memory_backend=args.memory_backend,
+                              batch=args.batch, jit=args.jit, profile=args.profile)
+    interpreter.interpret(args.input_file, args.output_file, (args.memory_start, args.memory_end), stream=args.stream,
+                          result_format=args.result_format)
@@ -0,0 +1,177 @@
+import json
+import struct
+import sys
+from array import array
+import yaml
+
+# Ускоренный C-эмиттер PyYAML, если библиотека собрана с libyaml
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+
+LOG_FORMATS = ('yaml', 'jsonl', 'binary')
+
+YAML_BATCH = 1024  # Количество записей, сбрасываемых в YAML за один вызов
+
+# Двоичный лог ассемблера: сигнатура, затем записи (B, C, 5 байтов команды)
+BINARY_LOG_MAGIC = b'UVML'
+_LOG_RECORD = struct.Struct('<HH5s')
+
+# Двоичный результат интерпретатора: сигнатура, диапазон, значения uint64
+BINARY_RESULT_MAGIC = b'UVMR'
+_RESULT_HEADER = struct.Struct('<QQ')
+
+
+def log_entry(name, a, b, c, instruction_bytes):
+    """Запись лога ассемблера в виде словаря."""
+    return {
+        'instruction': name,
+        'A': a,
+        'B': b,
+        'C': c,
+        'bytes': [f"0x{byte:02X}" for byte in instruction_bytes]
+    }
+
+
+class YamlLogWriter:
+    """Потоковый YAML-лог: записи сбрасываются пачками, вместе образуя один список."""
+
+    def __init__(self, f):
+        self.f = f
+        self.entries = []
+        self.empty = True
+
+    def write(self, name, a, b, c, instruction_bytes):
+        self.entries.append(log_entry(name, a, b, c, instruction_bytes))
+        if len(self.entries) >= YAML_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self.entries:
+            yaml.dump(self.entries, self.f, Dumper=YamlDumper)
+            self.entries = []
+            self.empty = False
+
+    def close(self):
+        self.flush()
+        if self.empty:
+            yaml.dump([], self.f, Dumper=YamlDumper)
+
+
+class JsonLinesLogWriter:
+    """Лог в формате JSON Lines: одна запись на строку."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, name, a, b, c, instruction_bytes):
+        self.f.write(json.dumps(log_entry(name, a, b, c, instruction_bytes), ensure_ascii=False))
+        self.f.write('\n')
+
+    def close(self):
+        pass
+
+
+class BinaryLogWriter:
+    """Компактный двоичный листинг: по 9 байтов на команду."""
+
+    def __init__(self, f):
+        self.f = f
+        self.f.write(BINARY_LOG_MAGIC)
+
+    def write(self, name, a, b, c, instruction_bytes):
+        self.f.write(_LOG_RECORD.pack(b, c, bytes(instruction_bytes)))
+
+    def close(self):
+        pass
+
+
+_LOG_WRITERS = {
+    'yaml': (YamlLogWriter, 'w'),
+    'jsonl': (JsonLinesLogWriter, 'w'),
+    'binary': (BinaryLogWriter, 'wb'),
+}
+
+
+class LogFile:
+    """Открыть файл лога в нужном формате; используется как контекстный менеджер."""
+
+    def __init__(self, path, log_format='yaml'):
+        if log_format not in _LOG_WRITERS:
+            raise ValueError(f"Unsupported log format: {log_format}")
+        writer_class, mode = _LOG_WRITERS[log_format]
+        self.f = open(path, mode, encoding='utf-8') if mode == 'w' else open(path, mode)
+        self.writer = writer_class(self.f)
+
+    def write(self, name, a, b, c, instruction_bytes):
+        self.writer.write(name, a, b, c, instruction_bytes)
+
+    def close(self):
+        try:
+            self.writer.close()
+        finally:
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_binary_log(path):
+    """Прочитать двоичный листинг в список кортежей (A, B, C, байты команды)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(BINARY_LOG_MAGIC)] != BINARY_LOG_MAGIC:
+        raise ValueError(f"Not a binary assembly log: {path}")
+    return [(raw[0], b, c, raw)
+            for b, c, raw in _LOG_RECORD.iter_unpack(memoryview(data)[len(BINARY_LOG_MAGIC):])]
+
+
+def write_result(path, memory_range, values, result_format='yaml'):
+    """Записать диапазон памяти интерпретатора в выбранном формате.
+
+    values — список значений либо memoryview ячеек uint64 (для двоичного формата
+    записывается без копирования).
+    """
+    if result_format == 'yaml':
+        result = {'memory_range': list(memory_range), 'values': _as_list(values)}
+        with open(path, 'w') as f:
+            yaml.dump(result, f, Dumper=YamlDumper)
+    elif result_format == 'jsonl':
+        with open(path, 'w') as f:
+            f.write(json.dumps({'memory_range': list(memory_range), 'values': _as_list(values)}))
+            f.write('\n')
+    elif result_format == 'binary':
+        if not isinstance(values, memoryview):
+            values = memoryview(array('Q', values))
+        with open(path, 'wb') as f:
+            f.write(BINARY_RESULT_MAGIC)
+            f.write(_RESULT_HEADER.pack(*memory_range))
+            if sys.byteorder != 'little':
+                swapped = array('Q', values.tobytes())
+                swapped.byteswap()
+                values = memoryview(swapped)
+            f.write(values)
+    else:
+        raise ValueError(f"Unsupported result format: {result_format}")
+
+
+def read_binary_result(path):
+    """Прочитать двоичный результат: ((начало, конец), array('Q') значений)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(BINARY_RESULT_MAGIC)] != BINARY_RESULT_MAGIC:
+        raise ValueError(f"Not a binary interpreter result: {path}")
+    offset = len(BINARY_RESULT_MAGIC)
+    memory_range = _RESULT_HEADER.unpack_from(data, offset)
+    values = array('Q', data[offset + _RESULT_HEADER.size:])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return memory_range, values
+
+
+def _as_list(values):
+    return values.tolist() if isinstance(values, memoryview) else list(values)
@@ -0,0 +1,156 @@
+import argparse
+import csv
+import os
+import time
+from batch_pool import run_pool, write_summary
+from fs_image import open_image
+from shell_emulator import CommandLog, ShellEmulator, load_zip_filesystem
+
+# Файловая система и лог, общие для всех сессий одного рабочего процесса
+_filesystem = None
+_log = None
+_settings = None
+
+
+def read_script(path):
+    """Команды из файла сценария: по одной на строку, пустые строки и '#' пропускаются."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def collect_sessions(source, username='user'):
+    """Сессии (имя, пользователь, команды) из каталога сценариев или записанного log.csv.
+
+    В CSV-логе новая сессия начинается при смене пользователя и после команды exit.
+    """
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if os.path.isfile(os.path.join(source, name)))
+        return [(os.path.splitext(name)[0], username, read_script(os.path.join(source, name))) for name in names]
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    sessions = []
+    current_user, commands = None, []
+    with open(source, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[1].strip():
+                continue
+            user, command = row[0], row[1].strip()
+            if commands and user != current_user:
+                sessions.append((f"{stem}.{len(sessions) + 1}", current_user, commands))
+                commands = []
+            current_user = user
+            commands.append(command)
+            if command == 'exit':
+                sessions.append((f"{stem}.{len(sessions) + 1}", current_user, commands))
+                commands = []
+    if commands:
+        sessions.append((f"{stem}.{len(sessions) + 1}", current_user, commands))
+    return sessions
+
+
+def init_worker(settings):
+    """Загрузить файловую систему и открыть лог один раз на рабочий процесс."""
+    global _filesystem, _log, _settings
+    _settings = settings
+    _filesystem = None
+    if settings['image']:
+        try:
+            _filesystem = open_image(settings['zip_path'])
+        except OSError:
+            pass  # Образ недоступен (например, каталог только для чтения): используется сам ZIP-файл
+    if _filesystem is None:
+        _filesystem = load_zip_filesystem(settings['zip_path'])
+    if settings['log_path'] is not None:
+        log_path = settings['log_path']
+        if settings['workers'] != 1:
+            # У каждого процесса свой файл лога, чтобы записи не перемешивались
+            base, ext = os.path.splitext(log_path)
+            log_path = f"{base}.{os.getpid()}{ext}"
+        _log = CommandLog(log_path, settings['log_format'])
+
+
+def run_session(session):
+    """Выполнить команды одной сессии; вывод и время каждой команды попадают в отчёт."""
+    name, username, commands = session
+    report = {'session': name, 'user': username, 'status': 'ok', 'commands': []}
+    transcript = []
+
+    start = time.perf_counter()
+    emulator = ShellEmulator(username, _settings['zip_path'], None, filesystem=_filesystem, log=_log)
+    try:
+        for command in commands:
+            command_start = time.perf_counter()
+            output = emulator.execute_command(command)
+            report['commands'].append({'command': command, 'output': output,
+                                       'seconds': time.perf_counter() - command_start})
+            transcript.append(f"{username}@emulator:~$ {command}\n{output}\n")
+            if command == 'exit':
+                break
+    except Exception as e:
+        report['status'] = 'error'
+        report['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        emulator.close()
+        # Рабочие процессы пула завершаются без обработчиков atexit: лог сбрасывается после каждой сессии
+        if _log is not None:
+            _log.flush()
+    report['seconds'] = time.perf_counter() - start
+
+    output_path = os.path.join(_settings['output_dir'], name + '.out')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.writelines(transcript)
+    report['output'] = output_path
+    return report
+
+
+def close_worker():
+    global _filesystem, _log
+    if _log is not None:
+        _log.close()
+    _filesystem.close()
+    _filesystem, _log = None, None
+
+
+def run_sessions(sessions, output_dir, zip_path='Fs.zip', log_path=None, log_format='csv', workers=None,
+                 image=True):
+    """Выполнить набор сессий в пуле процессов и вернуть сводку."""
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {
+        'output_dir': output_dir,
+        'zip_path': zip_path,
+        'log_path': log_path,
+        'log_format': log_format,
+        'workers': workers,
+        'image': image,
+    }
+
+    if image and workers != 1:
+        try:
+            open_image(zip_path).close()  # Образ собирается один раз до запуска рабочих процессов
+        except OSError:
+            pass
+
+    summary = run_pool(run_session, sessions, init_worker, settings, workers, finalizer=close_worker,
+                       key='sessions')
+    summary['commands'] = sum(len(report['commands']) for report in summary['sessions'])
+    return write_summary(output_dir, summary)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run shell emulator sessions from command scripts")
+    parser.add_argument("source", help="Directory with command scripts (one command per line) or a recorded log.csv")
+    parser.add_argument("output_dir", help="Directory for session transcripts and summary.json")
+    parser.add_argument("--zip", default="Fs.zip", help="Filesystem archive (default: Fs.zip)")
+    parser.add_argument("--user", default="user", help="User name for script files (default: user)")
+    parser.add_argument("--log", help="Append executed commands to this log file")
+    parser.add_argument("--log-format", choices=('csv', 'binary'), default='csv', help="Command log format")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--no-image", dest="image", action="store_false",
+                        help="Read the ZIP archive directly instead of the precompiled filesystem image")
+    args = parser.parse_args()
+
+    summary = run_sessions(collect_sessions(args.source, args.user), args.output_dir, zip_path=args.zip,
+                           log_path=args.log, log_format=args.log_format, workers=args.workers,
+                           image=args.image)
+    print(f"Ran {summary['total']} sessions ({summary['commands']} commands) in {summary['seconds']:.2f}s: "
+          f"{summary['succeeded']} succeeded, {summary['failed']} failed")
@@ -1,50 +1,355 @@
+import atexit
+import io
 import os
+import posixpath
+import struct
+import threading
+import time
 import zipfile
+from collections import OrderedDict
 from datetime import datetime
 import csv
 
+HOME = '/Fs'  # Начальный каталог эмулятора
+CONTENT_CACHE_SIZE = 64 * 1024 * 1024  # Предел суммарного размера прочитанных файлов в кэше (символов)
+
+LOG_FORMATS = ('csv', 'binary')
+LOG_BUFFER = 256  # Количество записей лога, после которого буфер сбрасывается в файл
+LOG_FLUSH_INTERVAL = 1.0  # Не реже чем раз в столько секунд буфер сбрасывается фоновым потоком
+
+# Двоичный лог команд: сигнатура, затем записи (время, длины имени и команды, UTF-8 строки)
+BINARY_LOG_MAGIC = b'SHLG'
+_LOG_RECORD = struct.Struct('<dHH')
+
+
+class Node:
+    """Файл или каталог: запись в таблице узлов файловой системы."""
+    __slots__ = ('inode', 'name', 'path', 'parent', 'children', 'content', 'source', 'owner')
+
+    def __init__(self, inode, name, path, parent, is_dir, owner=None):
+        self.inode = inode
+        self.name = name
+        self.path = path
+        self.parent = parent
+        self.children = {} if is_dir else None  # Имя -> узел, только у каталогов
+        self.content = None  # Содержимое файла, созданного в памяти
+        self.source = None  # Запись ZIP-архива, из которой содержимое читается по требованию
+        self.owner = owner
+
+    @property
+    def is_dir(self):
+        return self.children is not None
+
+
+class ContentCache:
+    """LRU-кэш содержимого файлов с ограничением суммарного размера."""
+
+    def __init__(self, max_size=CONTENT_CACHE_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        content = self.entries.get(key)
+        if content is not None:
+            self.entries.move_to_end(key)
+        return content
+
+    def put(self, key, content):
+        if len(content) > self.max_size:
+            return  # Файл больше всего кэша не сохраняется
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_size:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class FileSystem:
+    """Файловая система в памяти: таблица узлов (inode -> узел) и индекс путь -> узел.
+
+    Поиск по полному пути не зависит от глубины вложенности. Содержимое файлов
+    из архива читается при первом обращении и хранится в ограниченном кэше.
+    """
+
+    def __init__(self, archive=None, cache_size=CONTENT_CACHE_SIZE):
+        self.nodes = []
+        self.index = {}
+        self.archive = archive
+        self.cache = ContentCache(cache_size)
+        self.root = self.add_node('', '/', None, is_dir=True)
+
+    def add_node(self, name, path, parent, is_dir, owner=None):
+        node = Node(len(self.nodes), name, path, parent, is_dir, owner)
+        self.nodes.append(node)
+        self.index[path] = node
+        if parent is not None:
+            parent.children[name] = node
+        return node
+
+    def make_dirs(self, path):
+        """Каталог по пути вместе с недостающими родительскими."""
+        node = self.index.get(path)
+        if node is not None:
+            return node
+        parent_path, name = posixpath.split(path)
+        parent = self.make_dirs(parent_path)
+        return self.add_node(name, path, parent, is_dir=True)
+
+    def add_file(self, path, content, owner='default_owner'):
+        parent_path, name = posixpath.split(path)
+        node = self.add_node(name, path, self.make_dirs(parent_path), is_dir=False, owner=owner)
+        node.content = content
+        return node
+
+    def add_archived_file(self, path, source, owner='default_owner'):
+        parent_path, name = posixpath.split(path)
+        node = self.add_node(name, path, self.make_dirs(parent_path), is_dir=False, owner=owner)
+        node.source = source
+        return node
+
+    def lookup(self, path):
+        """Узел по нормализованному абсолютному пути или None."""
+        return self.index.get(posixpath.normpath(path).replace('//', '/'))
+
+    def read(self, node):
+        """Содержимое файла; файл из архива распаковывается и декодируется один раз."""
+        if node.content is not None or node.source is None:
+            return node.content
+        content = self.cache.get(node.inode)
+        if content is None:
+            data = self.read_source(node)
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError:
+                content = data.decode('utf-8', errors='ignore')  # Игнорирование ошибок
+            self.cache.put(node.inode, content)
+        return content
+
+    def iter_lines(self, node):
+        """Строки файла без символов перевода строки.
+
+        Если содержимого нет в памяти, файл читается потоком прямо из архива
+        и в кэш не попадает.
+        """
+        if node.content is not None or node.source is None:
+            return iter((node.content or '').splitlines())
+        content = self.cache.get(node.inode)
+        if content is not None:
+            return iter(content.splitlines())
+        return self.stream_lines(node)
+
+    def stream_lines(self, node):
+        # errors='ignore' даёт тот же текст, что и read(): для корректного UTF-8 ошибок нет.
+        # splitlines() каждой строки делит так же, как splitlines() всего содержимого
+        with self.open_source(node) as raw, \
+                io.TextIOWrapper(raw, encoding='utf-8', errors='ignore', newline='') as text:
+            for line in text:
+                yield from line.splitlines()
+
+    def read_source(self, node):
+        """Байты файла из архива."""
+        return self.archive.read(node.source)
+
+    def open_source(self, node):
+        """Двоичный поток файла из архива."""
+        return self.archive.open(node.source)
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+
+
+class CommandLog:
+    """Лог команд с постоянно открытым файлом и буфером записей.
+
+    Буфер сбрасывается при заполнении, фоновым потоком раз в flush_interval
+    секунд, при close() и при завершении интерпретатора (atexit).
+    """
+
+    def __init__(self, path, log_format='csv', buffer_size=LOG_BUFFER, flush_interval=LOG_FLUSH_INTERVAL):
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unsupported log format: {log_format}")
+        self.log_format = log_format
+        self.buffer_size = buffer_size
+        self.records = []
+        self.lock = threading.Lock()
+        if log_format == 'csv':
+            self.f = open(path, mode='a', newline='')
+            self.writer = csv.writer(self.f)
+        else:
+            self.f = open(path, mode='ab')
+            if self.f.tell() == 0:
+                self.f.write(BINARY_LOG_MAGIC)
+
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.flush_periodically, args=(flush_interval,), daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def write(self, username, command, timestamp=None):
+        record = (username, command, time.time() if timestamp is None else timestamp)
+        with self.lock:
+            self.records.append(record)
+            if len(self.records) >= self.buffer_size:
+                self.flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if not self.records or self.f.closed:
+            return
+        if self.log_format == 'csv':
+            self.writer.writerows(
+                [username, command, datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")]
+                for username, command, timestamp in self.records)
+        else:
+            chunks = []
+            for username, command, timestamp in self.records:
+                user_bytes, command_bytes = username.encode('utf-8'), command.encode('utf-8')
+                chunks.append(_LOG_RECORD.pack(timestamp, len(user_bytes), len(command_bytes)))
+                chunks.append(user_bytes)
+                chunks.append(command_bytes)
+            self.f.write(b''.join(chunks))
+        self.f.flush()
+        self.records = []
+
+    def flush_periodically(self, interval):
+        while not self.stopped.wait(interval):
+            self.flush()
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        with self.lock:
+            self.flush_locked()
+            self.f.close()
+        atexit.unregister(self.close)
+
+
+def read_binary_command_log(path):
+    """Прочитать двоичный лог команд в список кортежей (пользователь, команда, время)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(BINARY_LOG_MAGIC)] != BINARY_LOG_MAGIC:
+        raise ValueError(f"Not a binary command log: {path}")
+    records = []
+    offset = len(BINARY_LOG_MAGIC)
+    while offset < len(data):
+        timestamp, user_size, command_size = _LOG_RECORD.unpack_from(data, offset)
+        offset += _LOG_RECORD.size
+        username = data[offset:offset + user_size].decode('utf-8')
+        offset += user_size
+        command = data[offset:offset + command_size].decode('utf-8')
+        offset += command_size
+        records.append((username, command, timestamp))
+    return records
+
+
+def unique_lines(lines, count=False):
+    """Пары (строка, число повторений) без повторов в порядке первого появления за один проход.
+
+    Без count числа не подсчитываются (равны 1).
+    """
+    if not count:
+        return ((line, 1) for line in dict.fromkeys(lines))
+    counts = {}
+    for line in lines:
+        counts[line] = counts.get(line, 0) + 1
+    return counts.items()
+
+
+def unique_adjacent(lines):
+    """Пары (строка, число повторений подряд): в памяти только текущая строка."""
+    previous, number = None, 0
+    for line in lines:
+        if number and line == previous:
+            number += 1
+            continue
+        if number:
+            yield previous, number
+        previous, number = line, 1
+    if number:
+        yield previous, number
+
+
+def load_zip_filesystem(zip_path, cache_size=CONTENT_CACHE_SIZE):
+    """Построить дерево по центральному каталогу ZIP-файла; содержимое не читается."""
+    archive = zipfile.ZipFile(zip_path, 'r')
+    filesystem = FileSystem(archive, cache_size)
+    for info in archive.infolist():
+        path = '/' + info.filename.rstrip('/')
+        # Каталоги создаются вместе с недостающими родительскими
+        if info.is_dir():
+            filesystem.make_dirs(path)
+        else:
+            filesystem.add_archived_file(path, info)  # Владелец по умолчанию
+    return filesystem
+
 
 class ShellEmulator:
-    def __init__(self, username, zip_path, log_path):
+    """Эмулятор оболочки над файловой системой из ZIP-архива.
+
+    Готовую файловую систему (filesystem) и лог (log) можно разделять между
+    сессиями: файловая система не изменяется, chown записывается в собственную
+    таблицу владельцев сессии. Без log_path команды не записываются в лог.
+    С image=True файловая система открывается из образа <zip_path>.fsimg
+    (см. fs_image), который при необходимости собирается заново.
+    """
+
+    def __init__(self, username, zip_path, log_path, cache_size=CONTENT_CACHE_SIZE, log_format='csv',
+                 filesystem=None, log=None, image=True):
         self.username = username
         self.zip_path = zip_path
         self.log_path = log_path
-        self.current_directory = '/Fs'  # Инициализация корневого каталога
-        self.filesystem = self.load_filesystem(zip_path)  # Загрузка файловой системы
+        self.cache_size = cache_size
+        self.image = image
+        self.owns_filesystem = filesystem is None
+        self.owns_log = log is None and log_path is not None
+        # Загрузка файловой системы
+        self.filesystem = self.load_filesystem(zip_path) if filesystem is None else filesystem
+        self.log = CommandLog(log_path, log_format) if self.owns_log else log
+        self.owners = {}  # inode -> владелец, изменённый в этой сессии
+        self.cwd = self.filesystem.lookup(HOME) or self.filesystem.root  # Узел текущего каталога
+
+    @property
+    def current_directory(self):
+        return self.cwd.path
+
+    @current_directory.setter
+    def current_directory(self, path):
+        node = self.filesystem.lookup(path)
+        if node is None or not node.is_dir:
+            raise ValueError(f"Directory not found: {path}")
+        self.cwd = node
 
     def load_filesystem(self, zip_path):
-        """Загрузить файловую систему из ZIP-файла."""
-        filesystem = {}
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            for file_name in zip_ref.namelist():
-                print(f"Reading file: {file_name}")  # Логирование имени файла
-                parts = file_name.split('/')
-                current_level = filesystem
-
-                # Создание структуры каталогов в файловой системе
-                for part in parts[:-1]:  # Исключаем имя файла
-                    if part not in current_level:
-                        current_level[part] = {}  # Создаем новый каталог
-                    current_level = current_level[part]
-
-                # Чтение содержимого файла, если это не каталог
-                if parts[-1]:  # Если это не каталог
-                    try:
-                        content = zip_ref.read(file_name).decode('utf-8')
-                    except UnicodeDecodeError:
-                        content = zip_ref.read(file_name).decode('utf-8', errors='ignore')  # Игнорирование ошибок
-                    current_level[parts[-1]] = {
-                        'content': content,
-                        'owner': 'default_owner'  # Владельцем по умолчанию
-                    }
-        return filesystem
+        """Открыть образ файловой системы ZIP-файла или, если образ недоступен, сам ZIP-файл."""
+        if self.image:
+            from fs_image import open_image  # fs_image импортирует этот модуль
+            try:
+                return open_image(zip_path, cache_size=self.cache_size)
+            except OSError:
+                pass  # Например, каталог архива доступен только для чтения
+        return load_zip_filesystem(zip_path, self.cache_size)
+
+    def close(self):
+        """Сбросить лог команд и закрыть ZIP-архив файловой системы (если они не общие)."""
+        if self.owns_log:
+            self.log.close()
+        if self.owns_filesystem:
+            self.filesystem.close()
 
     def log_command(self, command):
-        """Записывает команду в лог-файл."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.log_path, mode='a', newline='') as log_file:
-            log_writer = csv.writer(log_file)
-            log_writer.writerow([self.username, command, timestamp])
+        """Записывает команду в лог (через буфер)."""
+        if self.log is not None:
+            self.log.write(self.username, command)
 
     def execute_command(self, command):
         self.log_command(command)
@@ -64,48 +369,53 @@ class ShellEmulator:
         elif cmd == 'exit':
             return self.exit()
         elif cmd == 'uniq':
-            return self.uniq(args[0] if args else '')
+            options = [arg for arg in args if arg.startswith('-')]
+            files = [arg for arg in args if not arg.startswith('-')]
+            unknown = set(options) - {'-c', '-a', '--count', '--adjacent'}
+            if unknown:
+                return f"Неизвестный параметр uniq: {sorted(unknown)[0]}"
+            return self.uniq(files[0] if files else '', count=bool({'-c', '--count'} & set(options)),
+                             adjacent=bool({'-a', '--adjacent'} & set(options)))
         else:
             return f"Команда '{cmd}' не поддерживается."
 
     def ls(self):
         current_level = self.get_current_directory()
-        if current_level:
+        if current_level is not None:
             output = []
-            for item, properties in current_level.items():
-                if isinstance(properties, dict):  # Проверка, что это файл или каталог
-                    owner = properties.get('owner', 'Неизвестный владелец')
-                    output.append(f"{item} (владелец: {owner})")
-                else:
-                    output.append(item)  # Это каталог, без информации о владельце
+            for item, node in current_level.children.items():
+                owner = self.owners.get(node.inode, node.owner)
+                if owner is None:
+                    owner = 'Неизвестный владелец'
+                output.append(f"{item} (владелец: {owner})")
             return '\n'.join(output)
         else:
             return "Директория не найдена."
 
+    def resolve(self, path):
+        """Узел по абсолютному пути или пути относительно текущего каталога."""
+        if path.startswith('/'):
+            # Абсолютный путь ищется от корня, затем от начального каталога
+            return self.filesystem.lookup(path) or self.filesystem.lookup(HOME + path)
+        return self.filesystem.lookup(posixpath.join(self.cwd.path, path))
 
     def cd(self, path):
         if path == "..":
-            if self.current_directory != '/Fs':
-                self.current_directory = '/'.join(self.current_directory.strip('/').split('/')[:-1]) or '/Fs'
+            if self.cwd.path != HOME and self.cwd.parent is not None:
+                self.cwd = self.cwd.parent
             return ""
-    
-        if path.startswith('/'):
-            target = path.strip('/')
-        else:
-            target = '/'.join(self.current_directory.strip('/').split('/')[:-1] + [path.strip('/')])
-    
-        current_level = self.get_current_directory()
-        if current_level is not None and target in current_level:
-            self.current_directory = '/Fs/' + target  
+
+        node = self.resolve(path) if path else None
+        if node is not None and node.is_dir:
+            self.cwd = node
             return ""
         else:
             return f"Директория '{path}' не найдена."
 
-
     def chown(self, new_owner, file_name):
-        current_level = self.get_current_directory()
-        if current_level is not None and file_name in current_level:
-            current_level[file_name]['owner'] = new_owner
+        node = self.resolve(file_name) if file_name else None
+        if node is not None:
+            self.owners[node.inode] = new_owner  # Общая файловая система не изменяется
             return f"Владелец файла '{file_name}' изменен на '{new_owner}'."
         else:
             return f"Файл '{file_name}' не найден."
@@ -114,25 +424,29 @@ class ShellEmulator:
         return self.current_directory
 
     def exit(self):
-        self.current_directory = '/'  # Сброс на корень при выходе
+        self.cwd = self.filesystem.root  # Сброс на корень при выходе
         return "Выход из эмулятора."
 
-    def uniq(self, file):
-        current_level = self.get_current_directory()
-        if current_level is not None and file in current_level:
-            content = current_level[file]['content']
-            return '\n'.join(sorted(set(content.splitlines()), key=content.splitlines().index)) if content else "Файл является двоичным."
+    def uniq(self, file, count=False, adjacent=False):
+        """Уникальные строки файла в порядке первого появления.
+
+        adjacent — убирать только соседние повторы (как uniq в Unix),
+        count — печатать перед строкой число её повторений.
+        """
+        node = self.resolve(file) if file else None
+        if node is not None and not node.is_dir:
+            lines = self.filesystem.iter_lines(node)
+            groups = unique_adjacent(lines) if adjacent else unique_lines(lines, count)
+            if count:
+                output = [f"{number:>7} {line}" for line, number in groups]
+            else:
+                output = [line for line, _ in groups]
+            return '\n'.join(output) if output else "Файл является двоичным."
         else:
             return f"Файл '{file}' не найден."
 
     def get_current_directory(self):
-        current_level = self.filesystem
-        for part in self.current_directory.strip('/').split('/'):
-            if part:
-                current_level = current_level.get(part)
-                if current_level is None:
-                    return None
-        return current_level
+        return self.cwd
 
 
 # Пример использования
@@ -148,3 +462,4 @@ if __name__ == '__main__':
         print(output)
         if command == 'exit':
             break
+    emulator.close()
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+from assembler import Assembler, AssemblyCache
+from log_formats import read_binary_log
+
+class TestAssembler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_assemble_program(self):
+        Assembler().assemble("program.asm", self.path("program.bin"), self.path("program.log"))
+        with open(self.path("program.bin"), "rb") as f, open("program.bin", "rb") as expected:
+            self.assertEqual(f.read(), expected.read())
+
+    def test_stream_matches_default(self):
+        Assembler().assemble("program.asm", self.path("a.bin"), self.path("a.log"))
+        assembler = Assembler()
+        assembler.assemble("program.asm", self.path("b.bin"), self.path("b.log"), stream=True)
+        self.assertEqual(assembler.instructions, [])  # Потоковый режим не накапливает команды
+        for a, b in (("a.bin", "b.bin"), ("a.log", "b.log")):
+            with open(self.path(a), "rb") as fa, open(self.path(b), "rb") as fb:
+                self.assertEqual(fa.read(), fb.read())
+
+    def test_log_formats(self):
+        Assembler().assemble("program.asm", self.path("p.bin"), self.path("p.jsonl"), log_format='jsonl')
+        with open(self.path("p.jsonl"), encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 7)
+        self.assertEqual(entries[0]['instruction'], "LOAD_CONST")
+
+        Assembler().assemble("program.asm", self.path("p.bin"), self.path("p.lst"), log_format='binary', stream=True)
+        records = read_binary_log(self.path("p.lst"))
+        with open("program.bin", "rb") as f:
+            self.assertEqual(b''.join(raw for a, b, c, raw in records), f.read())
+        self.assertEqual(records[-1][:3], (186, 389, 254))
+
+    def test_instructions_reset_between_calls(self):
+        assembler = Assembler()
+        assembler.assemble("program.asm", self.path("a.bin"))
+        assembler.assemble("program.asm", self.path("a.bin"))
+        self.assertEqual(len(assembler.instructions), 7)
+
+    def test_cache_hit_and_incremental_reassembly(self):
+        cache = AssemblyCache(self.path("cache"))
+        source = self.path("p.asm")
+        with open("program.asm") as f:
+            lines = f.read().splitlines()
+        with open(source, "w") as f:
+            f.write("\n".join(lines))
+
+        assembler = Assembler()
+        assembler.assemble(source, self.path("p.bin"), self.path("p.log"), cache=cache)
+
+        parsed = []
+        parse_line = assembler.parse_line
+        assembler.parse_line = lambda line: parsed.append(line) or parse_line(line)
+
+        # Неизменённый файл берётся из кэша целиком
+        assembler.assemble(source, self.path("q.bin"), self.path("q.log"), cache=cache)
+        self.assertEqual(parsed, [])
+        with open(self.path("p.bin"), "rb") as fp, open(self.path("q.bin"), "rb") as fq:
+            self.assertEqual(fp.read(), fq.read())
+
+        # После правки разбирается только изменённая строка
+        lines[1] = "LOAD_CONST 334 276"
+        with open(source, "w") as f:
+            f.write("\n".join(lines))
+        assembler.assemble(source, self.path("r.bin"), self.path("r.log"), cache=cache)
+        self.assertEqual(parsed, ["LOAD_CONST 334 276"])
+        with open(self.path("r.bin"), "rb") as f:
+            self.assertEqual(f.read()[5:10], assembler.encode_instruction(36, 334, 276, 5))
+
+        # Вставленная строка кодируется отдельно, остальные байты берутся из прошлого результата
+        parsed.clear()
+        lines.insert(3, "WRITE_MEM 1 2")
+        with open(source, "w") as f:
+            f.write("\n".join(lines))
+        assembler.assemble(source, self.path("s.bin"), self.path("s.log"), cache=cache)
+        self.assertEqual(parsed, ["WRITE_MEM 1 2"])
+        Assembler().assemble(source, self.path("t.bin"), self.path("t.log"))
+        for a, b in (("s.bin", "t.bin"), ("s.log", "t.log")):
+            with open(self.path(a), "rb") as fa, open(self.path(b), "rb") as fb:
+                self.assertEqual(fa.read(), fb.read())
+        self.assertFalse([name for name in os.listdir(self.path("cache")) if name.endswith(".tmp")])
+
+    def test_out_of_range_operand(self):
+        with self.assertRaises(ValueError):
+            Assembler().parse_instruction("READ_MEM 70000 1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+import unittest
+from batch_pool import run_pool, unique_names, write_summary
+
+_offset = None
+
+
+def init_offset(settings):
+    global _offset
+    _offset = settings['offset']
+
+
+def add_offset(value):
+    if value < 0:
+        return {'status': 'error', 'value': value}
+    return {'status': 'ok', 'value': value + _offset}
+
+class TestBatchPool(unittest.TestCase):
+    def test_run_pool(self):
+        for workers in (1, 2):
+            summary = run_pool(add_offset, [1, -1, 2], init_offset, {'offset': 10}, workers=workers, key='items')
+            self.assertEqual((summary['total'], summary['succeeded'], summary['failed']), (3, 2, 1))
+            self.assertEqual([report['value'] for report in summary['items']], [11, -1, 12])
+            self.assertEqual(summary['workers'], workers)
+
+    def test_finalizer_runs_in_process(self):
+        finalized = []
+        run_pool(add_offset, [1], init_offset, {'offset': 0}, workers=1, finalizer=lambda: finalized.append(True))
+        self.assertEqual(finalized, [True])
+
+    def test_unique_names(self):
+        self.assertEqual(unique_names(["a", "b", "a", "a-2", "a"]), ["a", "b", "a-3", "a-2", "a-4"])
+
+    def test_write_summary(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            summary = write_summary(tmp_dir, {'total': 0, 'jobs': []})
+            with open(os.path.join(tmp_dir, "summary.json")) as f:
+                self.assertEqual(json.load(f), summary)
+
+if __name__ == '__main__':
+    unittest.main()
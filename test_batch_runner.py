@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from batch_runner import collect_inputs, run_batch
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, "programs")
+        self.output_dir = os.path.join(self.tmp_dir.name, "out")
+        os.makedirs(self.input_dir)
+        for name in ("a.asm", "b.asm"):
+            shutil.copy("program.asm", os.path.join(self.input_dir, name))
+        shutil.copy("program.bin", os.path.join(self.input_dir, "c.bin"))
+        with open(os.path.join(self.input_dir, "broken.asm"), "w") as f:
+            f.write("LOAD_CONST 1 5000\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_collect_inputs_from_manifest(self):
+        manifest = os.path.join(self.input_dir, "manifest.txt")
+        with open(manifest, "w") as f:
+            f.write("a.asm\n# комментарий\n\nc.bin\n")
+        self.assertEqual(collect_inputs(manifest),
+                         [os.path.join(self.input_dir, "a.asm"), os.path.join(self.input_dir, "c.bin")])
+
+    def test_run_batch(self):
+        for workers in (1, 2):
+            summary = run_batch(collect_inputs(self.input_dir), self.output_dir, memory_range=(250, 600),
+                                workers=workers)
+            self.assertEqual((summary['succeeded'], summary['failed']), (3, 1))
+            with open(os.path.join(self.output_dir, "a.yaml")) as fa, \
+                    open(os.path.join(self.output_dir, "c.yaml")) as fc:
+                self.assertEqual(fa.read(), fc.read())
+            self.assertTrue(os.path.exists(os.path.join(self.output_dir, "summary.json")))
+
+    def test_memory_range_error_is_reported(self):
+        summary = run_batch(["program.asm"], self.output_dir, memory_range=(0, 5000), workers=1)
+        self.assertEqual(summary['jobs'][0]['status'], 'error')
+        self.assertIn("out of bounds", summary['jobs'][0]['error'])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "program.yaml")))
+
+    def test_same_stem_inputs_get_separate_outputs(self):
+        for sub in ("x", "y"):
+            os.makedirs(os.path.join(self.input_dir, sub))
+        shutil.copy("program.asm", os.path.join(self.input_dir, "x", "p.asm"))
+        with open(os.path.join(self.input_dir, "y", "p.asm"), "w") as f:
+            f.write("LOAD_CONST 7 0\n")
+        shutil.copy("program.bin", os.path.join(self.input_dir, "p.bin"))
+        inputs = [os.path.join(self.input_dir, path) for path in ("x/p.asm", "y/p.asm", "p.bin")]
+        summary = run_batch(inputs, self.output_dir, memory_range=(0, 1), workers=2)
+        self.assertEqual([job['result'] for job in summary['jobs']],
+                         [os.path.join(self.output_dir, name) for name in ("p.yaml", "p-2.yaml", "p-3.yaml")])
+        with open(os.path.join(self.output_dir, "p-2.yaml")) as f:
+            self.assertIn("- 7\n", f.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from batch_translator import collect_inputs, run_batch
+
+class TestBatchTranslator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, "configs")
+        self.output_dir = os.path.join(self.tmp_dir.name, "out")
+        os.makedirs(self.input_dir)
+        shutil.copy("input.json", os.path.join(self.input_dir, "a.json"))
+        with open(os.path.join(self.input_dir, "b.json"), "w") as f:
+            json.dump({"const": {"x": "${+ base 1}"}, "concat_example": "${concat greeting x}"}, f)
+        with open(os.path.join(self.input_dir, "broken.json"), "w") as f:
+            f.write('{"const": {"1bad": 1}}')
+        self.prelude = {"base": 41, "greeting": "Hello"}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_run_batch_directory(self):
+        for workers in (1, 2):
+            summary = run_batch(collect_inputs(self.input_dir), self.output_dir, prelude=self.prelude,
+                                workers=workers)
+            self.assertEqual((summary['succeeded'], summary['failed']), (2, 1))
+            with open(os.path.join(self.output_dir, "b.txt")) as f:
+                self.assertEqual(f.read(), "const x = 42\nconcat_example = [[Hello42]]\n")
+            with open(os.path.join(self.output_dir, "a.txt")) as f, open("output.txt") as expected:
+                self.assertEqual(f.read(), expected.read())
+            self.assertTrue(os.path.exists(os.path.join(self.output_dir, "summary.json")))
+
+    def test_run_batch_json_lines(self):
+        source = os.path.join(self.tmp_dir.name, "docs.jsonl")
+        with open(source, "w") as f:
+            f.write('{"expression_addition": "${+ base 1}"}\n\nnot json\n{"comment": "c"}\n')
+        summary = run_batch(collect_inputs(source), self.output_dir, prelude=self.prelude, workers=1)
+        self.assertEqual([job['status'] for job in summary['jobs']], ['ok', 'error', 'ok'])
+        with open(os.path.join(self.output_dir, "docs.1.txt")) as f:
+            self.assertEqual(f.read(), "expression_addition = 42\n")
+        with open(os.path.join(self.output_dir, "docs.4.txt")) as f:
+            self.assertEqual(f.read(), "|| c\n")
+
+    def test_manifest_same_stem_outputs(self):
+        for sub in ("x", "y"):
+            os.makedirs(os.path.join(self.input_dir, sub))
+            with open(os.path.join(self.input_dir, sub, "doc.json"), "w") as f:
+                json.dump({"comment": sub}, f)
+        manifest = os.path.join(self.input_dir, "manifest.txt")
+        with open(manifest, "w") as f:
+            f.write("x/doc.json\ny/doc.json\n")
+        summary = run_batch(collect_inputs(manifest), self.output_dir, workers=2)
+        self.assertEqual(summary['succeeded'], 2)
+        for name, comment in (("doc.txt", "x"), ("doc-2.txt", "y")):
+            with open(os.path.join(self.output_dir, name)) as f:
+                self.assertEqual(f.read(), f"|| {comment}\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from benchmark_config import generate_config, run_benchmark, translate_phases
+from config_translator import ConfigTranslator
+
+class TestBenchmarkConfig(unittest.TestCase):
+    def test_generate_config_shape(self):
+        config = generate_config(constants=30, list_depth=4, chain=20, comment_lines=5, seed=1)
+        self.assertEqual(len(config['const']), 30 + 21)
+        self.assertEqual(len(config['multi_comment']), 5)
+        self.assertEqual(len(config['const']['list2'][2][2][2]), 2)  # Самый глубокий список
+
+    def test_translate_phases_matches_translate(self):
+        config = generate_config(constants=30, chain=20, comment_lines=5)
+        text, timings = translate_phases(config)
+        self.assertEqual(text, ConfigTranslator().translate(config))
+        self.assertEqual(set(timings), {'comments', 'constants', 'expressions'})
+
+    def test_run_benchmark(self):
+        results = run_benchmark(constants=30, chain=20, comment_lines=5, repeat=1)
+        self.assertGreater(results['translate_bytes_per_second'], 0)
+        self.assertIn('constants_seconds', results)
+        self.assertIn('stream.peak_memory_bytes', results)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from assembler import Assembler
+from benchmark_vm import compare, generate_program, parse_mix, run_benchmark
+
+class TestBenchmarkVM(unittest.TestCase):
+    def test_generate_program_is_valid(self):
+        text = generate_program(200, parse_mix("LOAD_CONST=1,BITREVERSE=3"), memory_size=64, seed=1)
+        lines = text.splitlines()
+        self.assertEqual(len(lines), 200)
+        self.assertEqual({line.split()[0] for line in lines}, {"LOAD_CONST", "BITREVERSE"})
+        assembler = Assembler()
+        for line in lines:
+            assembler.parse_instruction(line)
+        self.assertEqual(len(assembler.instructions), 200)
+
+    def test_run_benchmark(self):
+        results = run_benchmark(100, modes=('scalar', 'jit'))
+        self.assertGreater(results['assemble_lines_per_second'], 0)
+        self.assertGreater(results['jit.execute_instructions_per_second'], 0)
+        self.assertIn('scalar.peak_memory_bytes', results)
+
+    def test_compare_detects_regressions(self):
+        baseline = {'size': 10, 'scalar.execute_instructions_per_second': 1000.0, 'result_dump_seconds': 1.0}
+        self.assertEqual(compare({'size': 10, 'scalar.execute_instructions_per_second': 900.0,
+                                  'result_dump_seconds': 1.1}, baseline), [])
+        regressions = compare({'size': 10, 'scalar.execute_instructions_per_second': 500.0,
+                               'result_dump_seconds': 2.0}, baseline)
+        self.assertEqual(len(regressions), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from config_reader import load, loads
+from config_translator import ConfigTranslator
+
+class TestConfigReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_output_example(self):
+        config = load("output.txt", cache=False)
+        self.assertEqual(config['comment'], "Single line")
+        self.assertEqual(config['multi_comment'], ["Multiple", "lines"])
+        self.assertEqual(config['const'], {"num1": 45, "str1": "This is line", "array1": [1, 2, 3]})
+        self.assertEqual(config['array_value'], [1, 2, 3])
+        self.assertEqual(config['concat_example'], "This is line - example")
+        self.assertEqual(config['ord_example'], 84)
+
+    def test_round_trip(self):
+        source = {
+            "comment": "c",
+            "multi_comment": ["a", "b"],
+            "const": {"n": -5, "s": "two\nlines", "lst": [1, "w", [2, "q y"]]},
+            "array_value": [1, "it's"],
+            "concat_example": "${concat s lst}",
+        }
+        config = loads(ConfigTranslator().translate(source))
+        self.assertEqual(config['const'], source['const'])
+        self.assertEqual(config['array_value'], source['array_value'])
+        self.assertEqual(config['concat_example'], "two\nlineslist(1, [[w]], list(2, [[q y]]))")
+
+    def test_strings_ending_with_bracket(self):
+        source = {
+            "const": {"s": "arr[0]", "t": "x]", "u": "]", "v": "a]] b", "w": "[q]"},
+            "array_value": ["arr[0]", "x]", "m, n]", 1],
+        }
+        text = ConfigTranslator().translate(source)
+        self.assertIn("const s = [[arr[0]]]", text)
+        config = loads(text)
+        self.assertEqual(config['const'], source['const'])
+        self.assertEqual(config['array_value'], source['array_value'])
+        # Внутри list(...) строку заканчивает ']]' перед ',' или ')'
+        self.assertEqual(loads("x = list([[a]]], [[m, n]]]] , list([[[0]]]), 2)\n")['x'],
+                         ["a]", "m, n]]", ["[0]"], 2])
+        self.assertEqual(loads("x = [[v]]]  \ny = [[w]]\n"), {'x': "v]", 'y': "w"})
+
+    def test_invalid_text(self):
+        for text in ("const x = [[open\n", "x 1\n", "=begin\nno end\n", "x = list(1, 2\n", "x = 1 2\n",
+                     "x = [[a]] b\n"):
+            with self.assertRaises(ValueError):
+                loads(text)
+
+    def test_cache_file(self):
+        path = os.path.join(self.tmp_dir.name, "config.txt")
+        shutil.copy("output.txt", path)
+        self.assertEqual(load(path), load("output.txt", cache=False))
+        self.assertTrue(os.path.exists(path + ".cache"))
+
+        # Изменённый файл разбирается заново
+        with open(path, "a") as f:
+            f.write("extra = 1\n")
+        self.assertEqual(load(path)['extra'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 import re
 import json
+import io
+import config_translator
 class ConfigTranslator:
     def translate(self, config, include_constants=False):
         output = ""
@@ -162,5 +164,139 @@ class TestConfigTranslator(unittest.TestCase):
         result = self.translator.translate(input_data, include_constants=True)
         self.assertEqual(result, expected_output)
 
+class TestExpressionEngine(unittest.TestCase):
+    def setUp(self):
+        self.translator = config_translator.ConfigTranslator()
+        self.translator.constants = {"num1": 10, "num2": 20, "str1": "Hello"}
+
+    def test_nested_expressions(self):
+        self.assertEqual(self.translator.parse_expression("${+ num1 ${* num2 2}}"), 50)
+        self.assertEqual(self.translator.parse_expression("${concat str1 [[, world]] ${- num2 num1}}"),
+                         "Hello, world10")
+        self.assertEqual(self.translator.parse_expression("${ord ${concat [[A]] str1}}"), 65)
+
+    def test_invalid_expressions(self):
+        for expr in ("${+ num1}", "${/ num1 num2}", "${+ num1 num2", "num1", "${+ num1 missing}"):
+            with self.assertRaises(ValueError):
+                self.translator.parse_expression(expr)
+
+    def test_expressions_are_cached(self):
+        first = config_translator.compile_expression("${+ num1 num2}")
+        self.assertIs(config_translator.compile_expression("${+ num1 num2}"), first)
+        self.assertEqual(first({"num1": 1, "num2": 2}), 3)
+
+    def test_translate_input_example(self):
+        with open("input.json") as f:
+            result = self.translator.translate(json.load(f))
+        self.assertIn("concat_example = [[This is line - example]]\n", result)
+        self.assertIn("ord_example = 84\n", result)
+
+class TestConstantResolution(unittest.TestCase):
+    def setUp(self):
+        self.translator = config_translator.ConfigTranslator()
+
+    def test_forward_references(self):
+        config = {
+            "const": {"total": "${+ base ${* step 2}}", "base": 10, "step": "${- base 7}", "items": [1, [2, "a"]]},
+            "concat_example": "${concat total items}",
+        }
+        result = self.translator.translate(config)
+        self.assertIn("const total = 16\nconst base = 10\nconst step = 3\n", result)
+        self.assertIn("concat_example = [[16list(1, list(2, [[a]]))]]\n", result)
+
+    def test_lazy_and_memoized(self):
+        constants = config_translator.ConstantTable()
+        constants.define("lst", [1, 2])
+        constants.define("broken", "${+ missing 1}")  # Не используется — не вычисляется
+        self.assertNotIn("lst", dict(constants))
+        self.assertEqual(constants["lst"], "list(1, 2)")
+        self.assertIn("lst", dict(constants))
+
+    def test_cycle_detection(self):
+        config = {"const": {"a": "${+ b 1}", "b": "${+ c 1}", "c": "${+ a 1}"}}
+        with self.assertRaises(ValueError) as error:
+            self.translator.translate(config)
+        self.assertIn("a -> b -> c -> a", str(error.exception))
+
+    def test_deep_reference_chain(self):
+        count = 5000
+        const = {f"c{i}": f"${{+ c{i + 1} 1}}" for i in range(count)}
+        const[f"c{count}"] = 0
+        result = self.translator.translate({"const": const, "expression_addition": "${+ c0 0}"})
+        self.assertIn(f"expression_addition = {count}\n", result)
+
+class TestIncrementalTranslation(unittest.TestCase):
+    def test_updates_match_full_translation(self):
+        with open("input.json") as f:
+            config = json.load(f)
+        config["const"]["total"] = "${+ num1 1}"
+        translator = config_translator.IncrementalTranslator()
+        edits = [
+            ("const", "num1", 7),
+            ("const", "str1", "Changed"),
+            ("const", "newConst", [1, 2]),
+            (None, "comment", "Edited comment"),
+            (None, "ord_example", "${ord str1}"),
+            ("const", "total", 5),
+        ]
+        self.assertEqual(translator.translate(config), config_translator.ConfigTranslator().translate(config))
+        for section, key, value in edits:
+            config = {**config, "const": dict(config["const"])}
+            (config["const"] if section else config)[key] = value
+            self.assertEqual(translator.translate(config), config_translator.ConfigTranslator().translate(config))
+
+    def test_only_dependents_are_rerendered(self):
+        config = {"const": {"a": 1, "b": "${+ a 1}", "c": "${+ b 1}", "d": 4}, "expression_addition": "${+ d 1}"}
+        translator = config_translator.IncrementalTranslator()
+        translator.translate(config)
+        rendered = []
+        render_constant = translator.translator.render_constant
+        translator.translator.render_constant = lambda name, value: rendered.append(name) or render_constant(name, value)
+        result = translator.translate({**config, "const": {**config["const"], "a": 10}})
+        self.assertEqual(sorted(rendered), ["a", "b", "c"])
+        self.assertIn("const c = 12\n", result)
+
+    def test_removed_constant(self):
+        translator = config_translator.IncrementalTranslator()
+        translator.translate({"const": {"a": 1}, "concat_example": "${concat a x}"})
+        self.assertEqual(translator.translate({"const": {}, "concat_example": "${concat a x}"}),
+                         "concat_example = [[ax]]\n")
+
+class TestStreamTranslation(unittest.TestCase):
+    def translate_stream(self, text, chunk_size=7):
+        # Маленькие блоки чтения проверяют дочитывание значений на границах
+        output = io.StringIO()
+        config_translator.ConfigTranslator().translate_stream(io.StringIO(text), output, chunk_size)
+        return output.getvalue()
+
+    def test_stream_matches_translate(self):
+        with open("input.json") as f:
+            text = f.read()
+        expected = config_translator.ConfigTranslator().translate(json.loads(text))
+        self.assertEqual(self.translate_stream(text), expected)
+
+    def test_stream_reordered_sections(self):
+        config = {
+            "ord_example": "${ord str1}",
+            "array_value": [1, 2],
+            "unknown": {"nested": [1, 2, 3]},
+            "const": {"num1": 12345, "str1": "Hi", "lst": [1, "a"]},
+            "expression_addition": "${+ num1 1}",
+            "comment": "first",
+        }
+        expected = config_translator.ConfigTranslator().translate(config)
+        self.assertEqual(self.translate_stream(json.dumps(config, indent=2)), expected)
+        self.assertTrue(expected.startswith("|| first\nconst num1 = 12345\n"))
+
+    def test_stream_forward_references(self):
+        config = {"const": {"a": 1, "b": "${+ c a}", "d": "x", "c": 5}, "expression_addition": "${+ b 1}"}
+        expected = config_translator.ConfigTranslator().translate(config)
+        self.assertIn("const b = 6\nconst d = [[x]]\n", expected)
+        self.assertEqual(self.translate_stream(json.dumps(config)), expected)
+
+    def test_stream_invalid_json(self):
+        with self.assertRaises(ValueError):
+            self.translate_stream('{"comment": "a" "const": {}}')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from fs_image import IMAGE_SUFFIX, ImageFileSystem, build_image, open_image, read_header
+from shell_emulator import FileSystem, ShellEmulator
+
+class TestFilesystemImage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = os.path.join(self.tmp_dir.name, "Fs.zip")
+        shutil.copy("Fs.zip", self.zip_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_image_matches_zip(self):
+        filesystem = open_image(self.zip_path)
+        commands = ["ls", "cd subdir1", "chown file1.txt bob", "ls", "uniq -c file1.txt", "cd ..",
+                    "uniq start.sh", "uniq .DS_Store", "exit", "ls", "cd /__MACOSX/Fs", "ls"]
+        from_zip = ShellEmulator("user", self.zip_path, None, image=False)
+        from_image = ShellEmulator("user", self.zip_path, None, filesystem=filesystem)
+        for command in commands:
+            self.assertEqual(from_image.execute_command(command), from_zip.execute_command(command), command)
+        self.assertIsNone(filesystem.lookup("/Fs/missing.txt"))
+        node = filesystem.lookup("/Fs/subdir1/file1.txt")
+        self.assertIs(node.parent, filesystem.lookup("/Fs/subdir1"))
+        from_zip.close()
+        filesystem.close()
+
+    def test_emulator_opens_image_by_default(self):
+        emulator = ShellEmulator("user", self.zip_path, None)
+        self.assertIsInstance(emulator.filesystem, ImageFileSystem)
+        self.assertTrue(os.path.exists(self.zip_path + IMAGE_SUFFIX))
+        self.assertIn("apple", emulator.uniq("subdir1/file1.txt"))
+        emulator.close()
+
+        emulator = ShellEmulator("user", self.zip_path, None, image=False)
+        self.assertNotIsInstance(emulator.filesystem, ImageFileSystem)
+        self.assertIsInstance(emulator.filesystem, FileSystem)
+        emulator.close()
+
+    def test_non_ascii_names(self):
+        zip_path = os.path.join(self.tmp_dir.name, "ru.zip")
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            archive.writestr("Fs/папка/файл.txt", "один\nдва\n")
+            archive.writestr("Fs/папка/другой.txt", "x\n")
+            archive.writestr("Fs/папка/вложенная/ещё.md", "y\n")
+            archive.writestr("Fs/заметки.txt", "z\n")
+        from_zip = ShellEmulator("user", zip_path, None, image=False)
+        from_image = ShellEmulator("user", zip_path, None)
+        self.assertEqual(set(from_image.filesystem.lookup("/Fs/папка").children),
+                         {"файл.txt", "другой.txt", "вложенная"})
+        for command in ["ls", "cd папка", "ls", "uniq файл.txt", "cd вложенная", "ls", "pwd"]:
+            self.assertEqual(from_image.execute_command(command), from_zip.execute_command(command), command)
+        from_zip.close()
+        from_image.close()
+
+    def test_rebuild_when_source_changes(self):
+        image_path = build_image(self.zip_path)
+        header = read_header(image_path)
+
+        # Только время изменения: образ не пересобирается, обновляется заголовок
+        os.utime(self.zip_path, ns=(header[7] + 10**9, header[7] + 10**9))
+        open_image(self.zip_path).close()
+        self.assertEqual(read_header(image_path)[7], header[7] + 10**9)
+        self.assertEqual(read_header(image_path)[8], header[8])
+
+        with zipfile.ZipFile(self.zip_path, "a") as archive:
+            archive.writestr("Fs/new.txt", "b\na\nb\n")
+        filesystem = open_image(self.zip_path)
+        self.assertNotEqual(read_header(image_path)[8], header[8])
+        emulator = ShellEmulator("user", self.zip_path, None, filesystem=filesystem)
+        self.assertEqual(emulator.uniq("new.txt"), "b\na")
+        filesystem.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+import unittest
+import yaml
+from log_formats import read_binary_result
+from interpreter import BATCH_MIN_RUN, JIT_CACHE_SIZE, Batch, Interpreter, Program, compile_program, decode, iter_decode, np, plan_batches, reverse_bits, reverse_bits_vector, LOAD_CONST, READ_MEM, WRITE_MEM, BITREVERSE
+
+class TestInterpreter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.bin_path = os.path.join(self.tmp_dir.name, "program.bin")
+        self.result_path = os.path.join(self.tmp_dir.name, "result.yaml")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_decode_program(self):
+        with open("program.bin", "rb") as f:
+            program = decode(f.read())
+        self.assertEqual(len(program), 7)
+        self.assertEqual(list(program.opcodes[:5]), [LOAD_CONST] * 4 + [READ_MEM])
+        self.assertEqual((program.operands_b[0], program.operands_c[0]), (702, 599))
+        self.assertEqual((program.operands_b[6], program.operands_c[6]), (389, 254))
+        self.assertEqual(program.offsets[6], 30)
+
+    def test_decode_skips_unknown_bytes(self):
+        # Мусорный байт перед командой пропускается
+        program = decode(bytes([0x00, BITREVERSE, 0x05, 0x10, 0x00, 0x00]))
+        self.assertEqual(list(program.opcodes), [BITREVERSE])
+        self.assertEqual((program.operands_b[0], program.operands_c[0]), (5, 1))
+        self.assertEqual(program.offsets[0], 1)
+
+    def test_interpret_program(self):
+        interpreter = Interpreter()
+        interpreter.interpret("program.bin", self.result_path, (250, 600))
+        with open(self.result_path) as f:
+            values = yaml.load(f, Loader=yaml.Loader)['values']
+        self.assertEqual(values[599 - 250], 702)
+        self.assertEqual(values[389 - 250], 222)
+        self.assertEqual(values[254 - 250], 123)  # 222 = 0b11011110 -> 0b01111011
+
+    def test_interpret_reports_failure(self):
+        interpreter = Interpreter()
+        self.assertTrue(interpreter.interpret("program.bin", self.result_path, (0, 10)))
+        self.assertFalse(interpreter.interpret("program.bin", self.result_path, (0, 5000)))
+        self.assertFalse(interpreter.interpret("missing.bin", self.result_path, (0, 10)))
+        with self.assertRaises(ValueError):
+            interpreter.run_file("program.bin", self.result_path, (0, 5000))
+        with self.assertRaises(FileNotFoundError):
+            interpreter.run_file("missing.bin", self.result_path, (0, 10))
+
+    def test_binary_result_format(self):
+        interpreter = Interpreter()
+        interpreter.interpret("program.bin", self.result_path, (250, 600), result_format='binary')
+        memory_range, values = read_binary_result(self.result_path)
+        self.assertEqual(memory_range, (250, 600))
+        self.assertEqual(values.tolist(), interpreter.snapshot_range(250, 600))
+
+    def test_profile_report(self):
+        for stream in (False, True):
+            interpreter = Interpreter(profile=True)
+            interpreter.interpret("program.bin", self.result_path, (0, 10), stream=stream)
+            with open(os.path.join(self.tmp_dir.name, "result.profile.json")) as f:
+                report = json.load(f)
+            self.assertEqual(report['instructions'], 7)
+            self.assertEqual(report['decode']['bytes'], 35)
+            self.assertEqual(report['opcodes']['LOAD_CONST']['count'], 4)
+            self.assertEqual(report['write_heatmap']['276'], 2)
+            self.assertEqual(report['hot_writes'][0], {'address': 276, 'count': 2})
+
+    def test_snapshot_and_resume(self):
+        with open("program.bin", "rb") as f:
+            program = decode(f.read())
+        reference = Interpreter()
+        reference.run(program)
+
+        interpreter = Interpreter()
+        interpreter.run(program, steps=4)
+        snapshot = interpreter.snapshot()
+        self.assertLess(len(snapshot), 1024)  # Память хранится в сжатом виде
+
+        resumed = Interpreter(memory_backend='paged')
+        resumed.restore(snapshot)
+        self.assertEqual(resumed.pc, 4)
+        resumed.run(program)
+        self.assertEqual(resumed.snapshot_range(0, 1024), reference.snapshot_range(0, 1024))
+
+    def test_fork_copy_on_write(self):
+        parent = Interpreter(memory_size=2048)
+        parent.load_constants(0, range(2048))
+        child = parent.fork()
+        child.load_constant(7, 1000)
+        parent.load_constant(9, 5)
+        self.assertEqual((parent.memory[1000], child.memory[1000]), (1000, 7))
+        self.assertEqual((parent.memory[5], child.memory[5]), (9, 5))
+        # Нетронутые страницы остаются общими
+        self.assertIs(parent.memory.pages[3], child.memory.pages[3])
+
+    def test_bulk_memory_operations(self):
+        interpreter = Interpreter(memory_size=16)
+        interpreter.load_constants(2, [1, 2, 3, 4])
+        interpreter.copy_memory(2, 4, 4)  # Перекрывающиеся диапазоны
+        self.assertEqual(interpreter.snapshot_range(0, 9), [0, 0, 1, 2, 1, 2, 3, 4, 0])
+        view = interpreter.memory_view(4, 8)
+        interpreter.load_constant(99, 5)
+        self.assertEqual(view.tolist(), [1, 99, 3, 4])  # Представление не копирует память
+
+    def test_bulk_memory_out_of_bounds(self):
+        interpreter = Interpreter(memory_size=4)
+        with self.assertRaises(ValueError):
+            interpreter.load_constants(2, [1, 2, 3])
+        with self.assertRaises(ValueError):
+            interpreter.copy_memory(0, 2, 3)
+
+    def test_load_constant_out_of_bounds(self):
+        program = Program()
+        program.append(LOAD_CONST, 5, 1, 0)
+        program.append(LOAD_CONST, 9, 100, 0)  # За пределами памяти: команда пропускается
+        for jit in (False, True):
+            interpreter = Interpreter(memory_size=4, jit=jit)
+            interpreter.execute(program)
+            self.assertEqual(interpreter.snapshot_range(0, 4), [0, 5, 0, 0])
+
+    def test_reverse_bits(self):
+        self.assertEqual(reverse_bits(0b00000001), 0b10000000)
+        self.assertEqual(reverse_bits(222), 123)
+        self.assertEqual(reverse_bits(0x0100), 0x0080)  # 16-битное слово
+        self.assertEqual(reverse_bits(0x00010000), 0x00008000)  # 32-битное слово
+        self.assertEqual(reverse_bits(reverse_bits(4097)), 4097)
+
+    def test_plan_batches(self):
+        def plan(steps, memory_size=32):
+            program = Program()
+            for a, b, c in steps:
+                program.append(a, b, c, 0)
+            return [(list(item.srcs), list(item.dsts), list(item.reverse)) if isinstance(item, Batch) else item
+                    for item in plan_batches(program, memory_size)]
+
+        # Чтение только что записанной ячейки начинает новую серию
+        steps = [(BITREVERSE, i, 16 + i) for i in range(6)] + [(READ_MEM, 16 + i, 24 + i) for i in range(4)]
+        self.assertEqual(plan(steps), [
+            ([0, 1, 2, 3, 4, 5], [16, 17, 18, 19, 20, 21], [1] * 6),
+            ([16, 17, 18, 19], [24, 25, 26, 27], [0] * 4),
+        ])
+
+        # Повторная запись в ячейку тоже прерывает серию; короткие серии выполняются пошагово
+        steps = [(READ_MEM, 0, 10), (READ_MEM, 1, 11), (READ_MEM, 2, 10), (WRITE_MEM, 12, 3),
+                 (READ_MEM, 4, 13), (BITREVERSE, 5, 14)]
+        self.assertEqual(plan(steps), [(0, 2), ([2, 3, 4, 5], [10, 12, 13, 14], [0, 0, 0, 1])])
+        self.assertEqual(plan(steps[:BATCH_MIN_RUN - 1]), [(0, BATCH_MIN_RUN - 1)])
+
+        # LOAD_CONST и выход за границы памяти выполняются пошагово
+        steps = ([(LOAD_CONST, 7, 0)] + [(READ_MEM, i, 8 + i) for i in range(4)] + [(READ_MEM, 5, 100)]
+                 + [(READ_MEM, 1, 2)] + [(WRITE_MEM, 20 + i, 4 + i) for i in range(4)])
+        self.assertEqual(plan(steps), [
+            (0, 1),
+            ([0, 1, 2, 3], [8, 9, 10, 11], [0] * 4),
+            (5, 6),
+            ([1, 4, 5, 6, 7], [2, 20, 21, 22, 23], [0] * 5),
+        ])
+        self.assertEqual(plan([(READ_MEM, i, 8 + i) for i in range(4)], memory_size=10), [(0, 4)])
+
+    @unittest.skipUnless(np, "NumPy is not installed")
+    def test_numpy_batches_match_scalar(self):
+        values = [1, 2, 300, 4000, 5, 6, 70000, 8, 0x123456789, 0xFFFFFFFFFFFFFFFF]
+        self.assertEqual(reverse_bits_vector(np.array(values, dtype=np.uint64)).tolist(),
+                         [reverse_bits(value) for value in values])
+
+        program = Program()
+        for i in range(10):
+            program.append(BITREVERSE, i, 16 + i, 0)
+        program.append(READ_MEM, 16, 30, 0)
+        for i in range(6):
+            program.append(WRITE_MEM, 32 + i, 20 + i, 0)
+        program.append(READ_MEM, 5, 1000, 0)  # Выход за границы прерывает серию
+
+        results = []
+        for backend, batch in (('array', False), ('numpy', True)):
+            interpreter = Interpreter(memory_size=64, memory_backend=backend, batch=batch)
+            interpreter.load_constants(0, values)
+            interpreter.execute(program)
+            results.append(interpreter.snapshot_range(0, 64))
+        self.assertEqual(results[0], results[1])
+
+    def test_jit_matches_interpreter_and_is_cached(self):
+        with open("program.bin", "rb") as f:
+            binary_data = f.read()
+        program = decode(binary_data)
+        results = []
+        for jit in (False, True):
+            interpreter = Interpreter(jit=jit)
+            interpreter.load_constants(600, [9, 8, 7])
+            interpreter.execute(program)
+            results.append(interpreter.snapshot_range(0, 1024))
+        self.assertEqual(results[0], results[1])
+        self.assertIs(compile_program(program, 1024), compile_program(decode(binary_data), 1024))
+
+    def test_jit_cache_is_bounded(self):
+        first = compile_program(decode(bytes([LOAD_CONST, 0, 0, 0, 0])), 16)
+        for size in range(JIT_CACHE_SIZE):
+            compile_program(decode(bytes([LOAD_CONST, 1, 0, 0, 0])), size)
+        # Вытесняется программа, к которой дольше всего не обращались
+        self.assertIsNot(compile_program(decode(bytes([LOAD_CONST, 0, 0, 0, 0])), 16), first)
+
+    def test_iter_decode_chunks(self):
+        with open("program.bin", "rb") as f:
+            binary_data = f.read()
+        chunks = list(iter_decode(binary_data, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(chunks[2].offsets[0], 30)
+
+    def test_stream_interpret_matches_default(self):
+        results = []
+        for stream in (False, True):
+            Interpreter().interpret("program.bin", self.result_path, (0, 1024), stream=stream)
+            with open(self.result_path) as f:
+                results.append(f.read())
+        self.assertEqual(results[0], results[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import csv
+import glob
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from script_runner import collect_sessions, run_sessions
+
+class TestScriptRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.script_dir = os.path.join(self.tmp_dir.name, "scripts")
+        self.output_dir = os.path.join(self.tmp_dir.name, "out")
+        os.makedirs(self.script_dir)
+        with open(os.path.join(self.script_dir, "a.txt"), "w") as f:
+            f.write("cd subdir1\nchown file1.txt alice\nls\n# комментарий\n\nuniq -c file1.txt\n")
+        with open(os.path.join(self.script_dir, "b.txt"), "w") as f:
+            f.write("cd subdir1\nls\npwd\nexit\nls\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_collect_sessions_from_log(self):
+        sessions = collect_sessions("log.csv")
+        self.assertEqual(sessions[0], ("log.1", "user", ["ls", "pwd", "exit"]))
+        self.assertEqual(sessions[1], ("log.2", "user", ["exit"]))
+        self.assertEqual(sessions[2][1:], ("test_user", ["ls", "-ls", "ls -l", "chown start.sh user2", "ls -l"]))
+
+    def test_run_sessions(self):
+        log_path = os.path.join(self.tmp_dir.name, "replay.csv")
+        for workers in (1, 2):
+            summary = run_sessions(collect_sessions(self.script_dir), self.output_dir, log_path=log_path,
+                                   workers=workers)
+            self.assertEqual((summary['succeeded'], summary['commands']), (2, 8))
+            a, b = summary['sessions']
+            self.assertEqual(a['commands'][2]['output'], "file1.txt (владелец: alice)")
+            # chown одной сессии не виден другой: файловая система общая, владельцы — свои
+            self.assertEqual(b['commands'][1]['output'], "file1.txt (владелец: default_owner)")
+            self.assertEqual(b['commands'][2]['output'], "/Fs/subdir1")
+            with open(os.path.join(self.output_dir, "b.out"), encoding="utf-8") as f:
+                self.assertIn("user@emulator:~$ exit\nВыход из эмулятора.\n", f.read())
+            with open(os.path.join(self.output_dir, "summary.json")) as f:
+                self.assertEqual(json.load(f)['total'], 2)
+
+        rows = []
+        for path in glob.glob(os.path.join(self.tmp_dir.name, "replay*.csv")):
+            with open(path, newline="") as f:
+                rows.extend(csv.reader(f))
+        self.assertEqual(len(rows), 16)
+
+    def test_run_sessions_image_by_default(self):
+        zip_path = os.path.join(self.tmp_dir.name, "Fs.zip")
+        shutil.copy("Fs.zip", zip_path)
+        summary = run_sessions(collect_sessions(self.script_dir), self.output_dir, zip_path=zip_path, workers=1,
+                               image=False)
+        self.assertFalse(os.path.exists(zip_path + ".fsimg"))
+        summary = run_sessions(collect_sessions(self.script_dir), self.output_dir, zip_path=zip_path, workers=2)
+        self.assertEqual(summary['sessions'][0]['commands'][2]['output'], "file1.txt (владелец: alice)")
+        self.assertTrue(os.path.exists(zip_path + ".fsimg"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
+import csv
+import os
+import tempfile
 import unittest
-from shell_emulator import ShellEmulator
+from shell_emulator import CommandLog, ShellEmulator, read_binary_command_log, unique_adjacent, unique_lines
 
 class TestShellEmulator(unittest.TestCase):
     def setUp(self):
@@ -9,6 +12,9 @@ class TestShellEmulator(unittest.TestCase):
         self.log_path = "log.csv"
         self.emulator = ShellEmulator(self.username, self.zip_path, self.log_path)
 
+    def tearDown(self):
+        self.emulator.close()
+
     def test_ls_command(self):
         result = self.emulator.ls()
         # Проверьте наличие нужных файлов в списке
@@ -53,5 +59,99 @@ class TestShellEmulator(unittest.TestCase):
         result = self.emulator.uniq("invalid_file.txt")
         self.assertEqual(result, "Файл 'invalid_file.txt' не найден.")
 
+    def test_cd_parent_and_nested_paths(self):
+        self.emulator.cd("subdir1")
+        self.emulator.cd("..")
+        self.assertEqual(self.emulator.pwd(), "/Fs")
+        self.emulator.cd("..")  # Выше начального каталога подняться нельзя
+        self.assertEqual(self.emulator.pwd(), "/Fs")
+        self.emulator.cd("/Fs/subdir1")
+        self.assertEqual(self.emulator.pwd(), "/Fs/subdir1")
+        self.assertEqual(self.emulator.cd("file1.txt"), "Директория 'file1.txt' не найдена.")
+
+    def test_path_index(self):
+        emulator = ShellEmulator(self.username, self.zip_path, None, image=False)  # Дерево из самого ZIP-файла
+        filesystem = emulator.filesystem
+        node = filesystem.lookup("/Fs/subdir1/file1.txt")
+        self.assertIs(node, filesystem.index["/Fs/subdir1"].children["file1.txt"])
+        self.assertIs(filesystem.nodes[node.inode], node)
+        self.assertIs(emulator.get_current_directory(), filesystem.index["/Fs"])
+        self.assertIn("apple", emulator.uniq("subdir1/file1.txt"))
+        emulator.close()
+
+    def test_lazy_content_loading(self):
+        filesystem = self.emulator.filesystem
+        self.assertEqual(filesystem.cache.size, 0)  # При загрузке содержимое не читается
+        node = filesystem.lookup("/Fs/subdir1/file1.txt")
+        self.assertIs(filesystem.read(node), filesystem.read(node))
+        self.assertEqual(list(filesystem.cache.entries), [node.inode])
+
+    def test_content_cache_eviction(self):
+        emulator = ShellEmulator(self.username, self.zip_path, self.log_path, cache_size=100)
+        filesystem = emulator.filesystem
+        first = filesystem.lookup("/Fs/subdir1/file1.txt")
+        second = filesystem.lookup("/Fs/file2.txt")
+        filesystem.read(first)
+        filesystem.read(second)  # 39 + 78 символов больше предела: первый файл вытесняется
+        self.assertEqual(list(filesystem.cache.entries), [second.inode])
+        self.assertLessEqual(filesystem.cache.size, 100)
+        self.assertIn("apple", emulator.uniq("/Fs/subdir1/file1.txt"))
+        emulator.close()
+
+    def test_uniq_options(self):
+        emulator = ShellEmulator(self.username, self.zip_path, None)  # Без записи в лог
+        emulator.cd("subdir1")
+        self.assertEqual(emulator.uniq("file1.txt"), "apple\nbanana\norange\ngrape")
+        self.assertEqual(emulator.execute_command("uniq -c file1.txt").splitlines()[0], "      2 apple")
+        self.assertEqual(emulator.filesystem.cache.size, 0)  # Файл читался потоком из архива
+        self.assertEqual(emulator.execute_command("uniq -x file1.txt"), "Неизвестный параметр uniq: -x")
+        emulator.close()
+
+    def test_unique_helpers(self):
+        lines = ["a", "a", "b", "a", "c", "c"]
+        self.assertEqual(list(unique_lines(lines)), [("a", 1), ("b", 1), ("c", 1)])
+        self.assertEqual(list(unique_lines(lines, count=True)), [("a", 3), ("b", 1), ("c", 2)])
+        self.assertEqual(list(unique_adjacent(iter(lines))), [("a", 2), ("b", 1), ("a", 1), ("c", 2)])
+
+class TestCommandLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_buffered_csv_log(self):
+        path = os.path.join(self.tmp_dir.name, "log.csv")
+        emulator = ShellEmulator("test_user", "Fs.zip", path)
+        emulator.execute_command("ls")
+        emulator.execute_command("cd subdir1")
+        self.assertEqual(os.path.getsize(path), 0)  # Записи ещё в буфере
+        emulator.close()
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual([row[:2] for row in rows], [["test_user", "ls"], ["test_user", "cd subdir1"]])
+        self.assertEqual(len(rows[0][2]), len("2024-10-14 02:52:42"))
+
+    def test_flush_on_buffer_size_and_interval(self):
+        path = os.path.join(self.tmp_dir.name, "log.csv")
+        log = CommandLog(path, buffer_size=2, flush_interval=0.01)
+        log.write("u", "ls")
+        log.write("u", "pwd")
+        self.assertEqual(log.records, [])
+        log.write("u", "exit")
+        log.stopped.wait(0.2)
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 3)  # Сброшено фоновым потоком
+        log.close()
+
+    def test_binary_log(self):
+        path = os.path.join(self.tmp_dir.name, "log.bin")
+        for command in ("ls", "uniq файл.txt"):
+            log = CommandLog(path, log_format='binary')
+            log.write("пользователь", command, 1700000000.5)
+            log.close()
+        self.assertEqual(read_binary_command_log(path), [("пользователь", "ls", 1700000000.5),
+                                                         ("пользователь", "uniq файл.txt", 1700000000.5)])
+
 if __name__ == '__main__':
     unittest.main()